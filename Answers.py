@@ -0,0 +1,86 @@
+from Predicate import make_predicate
+from Unification import Variable, is_variable
+
+"""
+Answer extraction for queries with variables: the negated query
+statement gets the answer predicate ANSWER_NAME(variables of the query),
+which no Knowledge base statement can resolve away, so the substitutions
+made while resolving the query are carried into it. A resolvent made of
+one answer predicate only is an answer, the bindings of the query variables.
+"""
+
+ANSWER_NAME = '#Answer'         #cannot clash with predicate names of the input, which begin with a letter
+
+class Answers(list):
+    """
+    answers of a query with variables, a list of tuples of the values of
+    variables (in order), true when at least one answer was found
+    member variables include:
+    variables : names of the variables of the query
+    keys : set of the answers, so every answer is added once
+    """
+    def __init__(self, variables, answers=()):
+        list.__init__(self, answers)
+        self.variables = variables
+        self.keys = set(tuple(values) for values in self)      # answers given are known, also when unpickled
+
+    def add(self, values):
+        """
+        adds the answer values unless it is known, returns True if it is new
+        """
+        key = tuple(['_' if is_variable(value) else value for value in values])
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.append(key)
+        return True
+
+    def bindings(self):
+        """
+        returns the answers as a list of dicts from variable to value
+        """
+        return [dict(zip(self.variables, values)) for values in self]
+
+    def __str__(self):
+        """
+        returns the answers as x=John,y=Tom;x=Ann,y=Bob where _ is a value
+        left as a variable (every value is an answer)
+        """
+        return ';'.join(','.join(variable + '=' + value for variable, value in zip(self.variables, values)) for values in self)
+
+    def __reduce__(self):
+        return (Answers, (self.variables, list(self)))
+
+def query_variables(predicate):
+    """
+    returns the variables of predicate in order of first occurrence
+    """
+    variables = []
+    for argument in predicate.arguments:
+        if is_variable(argument) and argument not in variables:
+            variables.append(argument)
+    return variables
+
+def rename_query(predicate):
+    """
+    renames the variables of a query predicate apart from the variables of
+    the Knowledge base statements, which are made of letters only
+    """
+    return predicate.substitute(dict((variable, Variable('_' + variable)) for variable in query_variables(predicate)))
+
+def answer_predicate(variables):
+    return make_predicate(False, ANSWER_NAME, tuple(variables))
+
+def statement_answer(statement):
+    """
+    returns the argument values of the answer predicate if statement
+    is a single answer predicate, None for any other statement
+    (a statement of several answer predicates is a disjunction of
+    answers, none of which is an answer on its own)
+    """
+    if len(statement.predicate_set) != 1:
+        return None
+    for predicate in statement.predicate_set:
+        if predicate.name == ANSWER_NAME:
+            return predicate.arguments
+    return None
@@ -0,0 +1,349 @@
+import argparse
+import itertools
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from Predicate import Predicate
+from Resolution import Prover, init_problem, convert_to_cnf, add_statement, prove_against, output_line, give_constant, TRUE, FALSE
+from CompiledKB import write_compiled_knowledgebase
+from ProofCache import knowledge_base_fingerprint
+import Resolution
+
+"""
+Benchmarks the prover in this process on the cases directory and on
+generated Knowledge bases, checks the answers and times separately
+
+cnf : converting the FOL sentences to CNF statements
+prepare : adding the CNF statements to the Knowledge base and its indexes
+prove : proving each query (reported as the total and the slowest query)
+
+every benchmark is run --repeat times and the fastest run is kept, a
+benchmark is flagged as a regression when a figure is slower than in
+the baseline results file by more than --tolerance (a fraction) and by
+at least MIN_REGRESSION seconds, the results replace the baseline only
+when --save is given, so a slow or wrong run never becomes the baseline
+
+the cases are also run with every settings of CASE_SETTINGS, which
+replace the settings of Resolution.py during the run, so every engine
+and option is checked against the expected outputs, a case whose
+expected output has answers (TRUE x=Ann;x=Bob) is run with
+ANSWER_EXTRACTION, and the fingerprint
+of every Knowledge base is also checked to be the same
+when its statements are read back from a compiled Knowledge base file
+by another process, which interns the symbols in the reverse order,
+and rules told twice in different orders are checked to be retracted
+"""
+
+RESULTS_FILE = 'benchmark.json'
+MIN_REGRESSION = 0.005          #slowdowns shorter than this (in seconds) are timer noise, not regressions
+FIGURES = ('cnf', 'prepare', 'prove')
+CASE_SETTINGS = [
+    ('small_passive', {'PASSIVE_LIMIT' : 1, 'HORN_FAST_PATH' : False}),    #passive set evicted to the archive and restored at every given clause
+    ('one_answer', {'MAX_ANSWERS' : 1}),                                    #queries with variables stop at their first answer
+    ('deepening', {'ITERATIVE_DEEPENING' : True, 'HORN_FAST_PATH' : False}), #resolvents limited in length in the rounds before the last, answers found in every round
+    ('set_of_sets', {'RESOLUTION_ENGINE' : 'set_of_sets', 'HORN_FAST_PATH' : False}),       #the set of sets resolution loop
+    ('signatures', {'RESOLUTION_ENGINE' : 'set_of_sets', 'SIGNATURE_FILTER' : True, 'HORN_FAST_PATH' : False}),     #resolving pairs selected by signature matrices
+    ('hyper', {'RESOLUTION_ENGINE' : 'hyper', 'HORN_FAST_PATH' : False}),     #positive hyperresolution
+    ('relevance', {'RELEVANCE_SLICING' : True, 'HORN_FAST_PATH' : False}),    #queries resolved against relevance slices
+    ('materialized', {'MATERIALIZATION' : True}),                           #ground queries looked up in the closure of the facts
+    ('definitional', {'CNF_MODE' : 'definitional'})                         #conjunctions under disjunctions replaced by fresh predicates
+]
+WITHOUT_SET_OF_SUPPORT = set(['hyper'])        #CASE_SETTINGS that prove every query of an inconsistent Knowledge base, not run on INCONSISTENT_CASES
+INCONSISTENT_CASES = set([8, 11])               #cases of the cases directory whose Knowledge base is inconsistent
+SOURCE_DIGEST = '\0' * 20        #source digest of the compiled Knowledge base files of the fingerprint check
+COMPILED_FINGERPRINT = ('import sys\n'
+    'from Predicate import SYMBOLS\n'
+    'from CompiledKB import read_compiled_knowledgebase\n'
+    'from ProofCache import knowledge_base_fingerprint\n'
+    'for symbol in sys.stdin.read().split():\n'
+    '    SYMBOLS.intern(symbol)\n'
+    'print knowledge_base_fingerprint(read_compiled_knowledgebase(sys.argv[1], sys.argv[2].decode("hex"))[0])\n')
+
+def constant(index):
+    return give_constant(index, True).capitalize()
+
+def ancestor_chain(length):
+    """
+    Parent facts along a chain of length people, Ancestor is
+    the transitive closure of Parent
+    """
+    sentences = ['(Parent(x,y) => Ancestor(x,y))', '((Parent(x,y) & Ancestor(y,z)) => Ancestor(x,z))']
+    for index in xrange(length - 1):
+        sentences.append('Parent(%s,%s)' % (constant(index), constant(index + 1)))
+    queries = [('Ancestor(%s,%s)' % (constant(0), constant(length - 1)), True),
+        ('Ancestor(%s,%s)' % (constant(length - 1), constant(0)), False),
+        ('Ancestor(%s,%s)' % (constant(length // 2), constant(length - 1)), True)]
+    return queries, sentences
+
+def family_tree(depth, branching):
+    """
+    complete tree of people with branching children per person, every
+    person is Male or Female, with rules for Father, Mother and Grandparent
+    """
+    sentences = ['((Parent(x,y) & Male(x)) => Father(x,y))', '((Parent(x,y) & Female(x)) => Mother(x,y))',
+        '((Parent(x,y) & Parent(y,z)) => Grandparent(x,z))']
+    level = [0]
+    count = 1
+    grandchild = None
+    for generation in xrange(depth):
+        next_level = []
+        for parent in level:
+            for _ in xrange(branching):
+                sentences.append('Parent(%s,%s)' % (constant(parent), constant(count)))
+                next_level.append(count)
+                count += 1
+        level = next_level
+        if generation == 1:
+            grandchild = level[-1]
+    for person in xrange(count):
+        sentences.append(('Male(%s)' if person % 2 else 'Female(%s)') % constant(person))
+    queries = [('Mother(%s,%s)' % (constant(0), constant(1)), True),
+        ('Father(%s,%s)' % (constant(0), constant(1)), False)]
+    if grandchild is not None:
+        queries.append(('Grandparent(%s,%s)' % (constant(0), constant(grandchild)), True))
+        queries.append(('Grandparent(%s,%s)' % (constant(grandchild), constant(0)), False))
+    return queries, sentences
+
+def dense_rules(predicates, rules, seed=0):
+    """
+    random unary rules with one or two premises over predicates predicate
+    names and one fact, the answers are found by forward chaining
+    """
+    generator = random.Random(seed)
+    names = ['Rule' + give_constant(index, True).capitalize() for index in xrange(predicates)]
+    sentences = ['%s(Start)' % names[0]]
+    premises = []
+    for _ in xrange(rules):
+        body = generator.sample(xrange(predicates), generator.randint(1, 2))
+        head = generator.randrange(predicates)
+        premises.append((body, head))
+        sentences.append('(%s => %s(x))' % (' & '.join('%s(x)' % names[index] for index in body), names[head]))
+    derived = set([0])
+    changed = True
+    while changed:
+        changed = False
+        for body, head in premises:
+            if head not in derived and all(index in derived for index in body):
+                derived.add(head)
+                changed = True
+    queries = [('%s(Start)' % names[index], index in derived) for index in xrange(0, predicates, max(1, predicates // 8))]
+    return queries, sentences
+
+def ground_facts(facts, people, seed=0):
+    """
+    facts random Likes facts between people people, two people
+    who like each other are Friends
+    """
+    generator = random.Random(seed)
+    likes = set()
+    while len(likes) < min(facts, people * people):
+        likes.add((generator.randrange(people), generator.randrange(people)))
+    sentences = ['((Likes(x,y) & Likes(y,x)) => Friends(x,y))']
+    sentences.extend('Likes(%s,%s)' % (constant(a), constant(b)) for a, b in likes)
+    queries = []
+    for a, b in sorted(likes)[::max(1, len(likes) // 8)]:
+        queries.append(('Friends(%s,%s)' % (constant(a), constant(b)), (b, a) in likes))
+    return queries, sentences
+
+GENERATORS = [
+    ('ancestor_chain', ancestor_chain, lambda scale: (20 * scale,)),
+    ('family_tree', family_tree, lambda scale: (3 + scale // 4, 3)),
+    ('dense_rules', dense_rules, lambda scale: (10 * scale, 30 * scale)),
+    ('ground_facts', ground_facts, lambda scale: (200 * scale, 20 * scale))
+]
+
+def load_case(directory, number):
+    """
+    returns the queries with their expected output lines and the
+    FOL sentences of cases/input<number>.txt and cases/output<number>.txt
+    """
+    queries, sentences = init_problem(os.path.join(directory, 'input%d.txt' % number))
+    with open(os.path.join(directory, 'output%d.txt' % number)) as f_output:
+        expected = [line.strip() for line in f_output.read().splitlines() if line.strip()]
+    return zip(queries, expected), sentences
+
+def output_matches(line, expected):
+    """
+    returns True if the output line of a query is the expected line,
+    answers may be found in any order, and when there are more than
+    MAX_ANSWERS expected answers any MAX_ANSWERS of them match
+    """
+    value, _, answers = line.partition(' ')
+    expected_value, _, expected_answers = expected.partition(' ')
+    answers = set(answers.split(';')) if answers else set()
+    expected_answers = set(expected_answers.split(';')) if expected_answers else set()
+    if value != expected_value:
+        return False
+    if Resolution.MAX_ANSWERS is not None and len(expected_answers) > Resolution.MAX_ANSWERS:
+        return len(answers) == Resolution.MAX_ANSWERS and answers <= expected_answers
+    return answers == expected_answers
+
+def run_benchmark(queries, sentences):
+    """
+    prepares a Knowledge base of sentences and proves
+    queries against it, returns the timings and wrong answers, the
+    expected result of a query is True, False, its output line or None
+    """
+    start = time.time()
+    statements = [stmt_obj for sentence in sentences for stmt_obj in convert_to_cnf(sentence.replace(' ', ''))]
+    cnf = time.time() - start
+    prover = Prover()
+    start = time.time()
+    for stmt_obj in statements:
+        add_statement(stmt_obj, prover.knowledge_base, prover.knowledge_base_hash, prover.knowledge_base_features, prover.horn_prover, prover.relevance, prover.signatures)
+    prepare = time.time() - start
+    query_times = []
+    wrong = []
+    for query, expected in queries:
+        start = time.time()
+        if not isinstance(query, Predicate):
+            query = Predicate(query)
+        result = prove_against(query, prover.knowledge_base, prover.knowledge_base_hash, prover.knowledge_base_features, prover.horn_prover, prover.relevance, prover.signatures)
+        query_times.append(time.time() - start)
+        if isinstance(expected, bool):
+            expected = TRUE if expected else FALSE
+        if expected is not None and not output_matches(output_line(result), expected):
+            wrong.append('%s : %s expected %s' % (query, output_line(result), expected))
+    return {'cnf' : cnf, 'prepare' : prepare, 'prove' : sum(query_times), 'slowest_query' : max(query_times or [0]),
+        'statements' : len(statements), 'queries' : len(query_times), 'wrong' : wrong}
+
+def fingerprint_differs(sentences):
+    """
+    returns True if the fingerprint of the CNF statements of sentences
+    differs from the one a new process computes from their compiled
+    Knowledge base file after interning their symbols in reverse order
+    """
+    statements = [stmt_obj for sentence in sentences for stmt_obj in convert_to_cnf(sentence.replace(' ', ''))]
+    symbols = []
+    for stmt_obj in statements:
+        for predicate in stmt_obj.predicate_set:
+            symbols.append(predicate.name)
+            symbols.extend(predicate.arguments)
+    handle, path = tempfile.mkstemp(suffix='.kb')
+    os.close(handle)
+    try:
+        write_compiled_knowledgebase(path, statements, SOURCE_DIGEST, 0)
+        child = subprocess.Popen([sys.executable, '-c', COMPILED_FINGERPRINT, path, SOURCE_DIGEST.encode('hex')],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, cwd=os.path.dirname(os.path.abspath(__file__)))
+        compiled = child.communicate(' '.join(reversed(symbols)))[0]
+    finally:
+        os.remove(path)
+    return compiled.strip() != knowledge_base_fingerprint(statements)
+
+def retraction_wrong(names):
+    """
+    tells Provers two sentences of the same rule written in opposite
+    orders, for ground rules of three premises and a conclusion taken from
+    names, retracts both and returns the sentences not retracted cleanly
+    """
+    wrong = []
+    for premises in itertools.permutations(names, 4):
+        predicates = ['~%s(Bob)' % name for name in premises[:3]] + ['%s(Bob)' % premises[3]]
+        sentences = ['(%s)' % ' | '.join(predicates), '(%s)' % ' | '.join(reversed(predicates))]
+        prover = Prover(sentences)
+        try:
+            for sentence in sentences:
+                prover.retract(sentence)
+        except ValueError as error:
+            wrong.append('%s : %s' % (sentences[1], error))
+            continue
+        if prover.knowledge_base or prover.horn_prover.rules:
+            wrong.append('%s : statements left' % sentences[1])
+    return wrong
+
+def best_run(queries, sentences, repeat, settings):
+    """
+    runs a benchmark repeat times with settings replacing the
+    settings of Resolution.py and keeps the fastest figures
+    """
+    saved = dict((setting, getattr(Resolution, setting)) for setting in settings)
+    best = None
+    for _ in xrange(repeat):
+        for setting, value in settings.iteritems():
+            setattr(Resolution, setting, value)
+        try:
+            result = run_benchmark(queries, sentences)
+        finally:
+            for setting, value in saved.iteritems():
+                setattr(Resolution, setting, value)
+        if best is None:
+            best = result
+        else:
+            for figure in FIGURES + ('slowest_query',):
+                best[figure] = min(best[figure], result[figure])
+    return best
+
+def find_regressions(name, result, previous, tolerance):
+    """
+    returns the figures of result slower than in previous
+    """
+    regressions = []
+    if name not in previous:
+        return regressions
+    for figure in FIGURES:
+        before = previous[name].get(figure)
+        if before is not None and result[figure] > before * (1 + tolerance) and result[figure] - before > MIN_REGRESSION:
+            regressions.append('%s %.1fms -> %.1fms' % (figure, before * 1000, result[figure] * 1000))
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description='benchmarks the prover on the cases directory and on generated Knowledge bases')
+    parser.add_argument('--cases', default='cases', help='directory of inputN.txt and outputN.txt, empty to skip')
+    parser.add_argument('--scale', type=int, default=1, help='size of the generated Knowledge bases, 0 to skip them')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--results', default=RESULTS_FILE, help='JSON baseline results file compared with')
+    parser.add_argument('--save', action='store_true', help='write the results to the --results file as the new baseline')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    options = parser.parse_args()
+    benchmarks = []
+    if options.cases:
+        number = 1
+        while os.path.exists(os.path.join(options.cases, 'input%d.txt' % number)):
+            queries, sentences = load_case(options.cases, number)
+            case_settings = {}
+            if any(' ' in expected for _, expected in queries):
+                case_settings['ANSWER_EXTRACTION'] = True
+            benchmarks.append(('case%d' % number, queries, sentences, case_settings, True))
+            for name, settings in CASE_SETTINGS:
+                if name in WITHOUT_SET_OF_SUPPORT and number in INCONSISTENT_CASES:
+                    continue
+                benchmarks.append(('case%d_%s' % (number, name), queries, sentences, dict(case_settings, **settings), False))
+            number += 1
+    if options.scale > 0:
+        for name, generator, arguments in GENERATORS:
+            benchmarks.append(('%s_x%d' % (name, options.scale),) + generator(*arguments(options.scale)) + ({}, True))
+    previous = {}
+    if os.path.exists(options.results):
+        with open(options.results) as f_results:
+            previous = json.load(f_results)
+    results = {}
+    failed = False
+    print '%-24s %10s %10s %10s %10s %6s  %s' % ('benchmark', 'cnf ms', 'prepare ms', 'prove ms', 'slowest ms', 'stmts', 'status')
+    for name, queries, sentences, settings, check_fingerprint in benchmarks:
+        result = best_run(queries, sentences, options.repeat, settings)
+        results[name] = result
+        status = []
+        if result['wrong']:
+            status.append('WRONG ' + ', '.join(result['wrong']))
+        if check_fingerprint and fingerprint_differs(sentences):
+            status.append('FINGERPRINT differs from the compiled Knowledge base')
+        regressions = find_regressions(name, result, previous, options.tolerance)
+        if regressions:
+            status.append('REGRESSION ' + ', '.join(regressions))
+        failed = failed or bool(status)
+        print '%-24s %10.1f %10.1f %10.1f %10.1f %6d  %s' % (name, result['cnf'] * 1000, result['prepare'] * 1000,
+            result['prove'] * 1000, result['slowest_query'] * 1000, result['statements'], '; '.join(status) or 'ok')
+    wrong = retraction_wrong(['Rule' + constant(index) for index in xrange(8)])
+    failed = failed or bool(wrong)
+    print '%-24s %s' % ('tell_retract', 'WRONG ' + ', '.join(wrong[:3]) if wrong else 'ok')
+    if options.save:
+        with open(options.results, 'w') as f_results:
+            json.dump(results, f_results, indent=1, sort_keys=True)
+    return failed
+
+if __name__ == '__main__':
+    raise SystemExit(1 if main() else 0)
@@ -0,0 +1,78 @@
+import os
+import time
+import Trace
+
+try:
+    import resource
+except ImportError:
+    resource = None
+
+MEMORY_CHECK_INTERVAL = 64      #number of checks between two reads of the process memory
+
+class Budget(object):
+    """
+    limits of one proof, checked cooperatively by the resolution loops,
+    a proof that exceeds its budget stops with an unknown result
+    member variables include:
+    deadline : time.time() at which the proof stops (or None)
+    memory_limit : bytes the process may grow by during the proof (or None)
+    statement_limit : number of stored statements at which the proof stops (or None)
+    length_limit : resolvents with more predicates are dropped (or None)
+    truncated : True once a resolvent was dropped by length_limit, a proof
+    that fails to find a contradiction then does not show the query is false
+    exhausted : 'time', 'memory' or 'statements' once the budget is exceeded
+    """
+    def __init__(self, deadline=None, memory_limit=None, statement_limit=None, length_limit=None):
+        self.deadline = deadline
+        self.memory_limit = memory_limit
+        self.statement_limit = statement_limit
+        self.length_limit = length_limit
+        self.memory_start = current_memory() if memory_limit is not None else None
+        self.truncated = False
+        self.exhausted = None
+        self.checks = 0
+
+    def exceeded(self, statements=None):
+        """
+        returns True if the proof must stop, statements is the number
+        of statements the proof stores (not checked when None)
+        """
+        if self.statement_limit is not None and statements is not None and statements > self.statement_limit:
+            return self.exhaust('statements')
+        if self.deadline is not None and time.time() > self.deadline:
+            return self.exhaust('time')
+        if self.memory_start is not None:
+            self.checks += 1
+            if self.checks % MEMORY_CHECK_INTERVAL == 0 and current_memory() - self.memory_start > self.memory_limit:
+                return self.exhaust('memory')
+        return False
+
+    def exhaust(self, reason):
+        self.exhausted = reason
+        if Trace.TRACE is not None:
+            Trace.TRACE.count('budget_' + reason)
+        return True
+
+    def allows(self, statement):
+        """
+        returns False if statement is longer than length_limit
+        """
+        if self.length_limit is not None and len(statement.predicate_set) > self.length_limit:
+            self.truncated = True
+            return False
+        return True
+
+def current_memory():
+    """
+    returns the resident memory of the process in bytes, from /proc when
+    available, otherwise the peak resident memory reported by resource
+    returns 0 if neither is available, so memory limits are not enforced
+    """
+    try:
+        with open('/proc/self/statm') as f_statm:
+            return int(f_statm.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (IOError, OSError, ValueError, IndexError):
+        pass
+    if resource is not None:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return 0
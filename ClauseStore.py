@@ -0,0 +1,86 @@
+import cPickle
+import tempfile
+import Trace
+
+class ClauseStore(object):
+    """
+    keeps the passive set of the given clause engine within limit
+    statements, when it grows beyond limit the passive statements chosen
+    by the retention policy ('heaviest' or 'oldest') are evicted down to
+    RETAINED_FRACTION of limit (at least one statement is kept, so
+    the engine always has a given clause), and removed from the feature index
+    evicted statements are archived in a temporary file when archive is
+    True and pushed back when the passive set runs empty, so no statement
+    is lost, otherwise they are discarded and a proof that finds no
+    contradiction no longer shows the query is false
+    member variables include:
+    passive : PassiveQueue of the engine
+    features : feature index of the engine (or None)
+    evicted : number of statements evicted from the passive set
+    discarded : number of evicted statements that were not archived
+    archived : number of statements in the archive file
+    """
+    RETAINED_FRACTION = 0.75
+
+    def __init__(self, passive, features, limit, policy='heaviest', archive=True):
+        self.passive = passive
+        self.features = features
+        self.limit = limit
+        self.policy = policy
+        self.archive = archive
+        self.archive_file = None
+        self.evicted = 0
+        self.discarded = 0
+        self.archived = 0
+
+    def retain(self):
+        """
+        evicts passive statements if there are more than limit
+        """
+        if self.limit is None or len(self.passive) <= self.limit:
+            return
+        retained = max(1, int(self.limit * self.RETAINED_FRACTION))
+        victims = self.passive.evict(len(self.passive) - retained, self.policy)
+        for statement in victims:
+            if self.features is not None:
+                self.features.remove(statement)
+        self.evicted += len(victims)
+        if Trace.TRACE is not None:
+            Trace.TRACE.count('evicted', len(victims))
+        if not self.archive:
+            self.discarded += len(victims)
+            return
+        if self.archive_file is None:
+            self.archive_file = tempfile.TemporaryFile()
+        for statement in victims:
+            cPickle.dump(statement, self.archive_file, cPickle.HIGHEST_PROTOCOL)
+        self.archived += len(victims)
+
+    def restore(self, KB):
+        """
+        pushes the archived statements that are not in KB or already
+        in the passive set back into it, returns False if none was pushed
+        """
+        if not self.archived:
+            return False
+        self.archive_file.seek(0)
+        statements = [cPickle.load(self.archive_file) for _ in xrange(self.archived)]
+        self.archive_file.seek(0)
+        self.archive_file.truncate()
+        self.archived = 0
+        if Trace.TRACE is not None:
+            Trace.TRACE.count('restored', len(statements))
+        pushed = 0
+        for statement in statements:
+            if statement not in KB and statement not in self.passive:
+                if self.features is not None:
+                    self.features.add(statement)
+                self.passive.push(statement)
+                pushed += 1
+        self.retain()
+        return pushed > 0
+
+    def close(self):
+        if self.archive_file is not None:
+            self.archive_file.close()
+            self.archive_file = None
@@ -0,0 +1,115 @@
+import array
+import mmap
+import os
+import struct
+import sys
+from Predicate import make_predicate, intern_symbol
+from Statement import Statement
+
+"""
+Layout of a compiled knowledge base file (all integers little endian uint32):
+
+header : magic, sha1 digest of the source FOL sentences, standard variable
+         count, number of symbols, statements, predicates and arguments
+symbol table : number of symbols + 1 offsets into the symbol bytes, followed
+         by the symbol bytes (predicate names, constants and variables)
+statements : number of statements + 1 offsets into the predicate records
+predicates : one (symbol id of the name, arity << 1 | negative, offset into
+         the arguments) record per predicate
+arguments : symbol ids of the predicate arguments
+"""
+MAGIC = 'FOLKB\x00\x00\x01'
+HEADER = struct.Struct('<8s20sIIIII')
+PREDICATE_RECORD = struct.Struct('<III')
+
+def write_compiled_knowledgebase(path, statements, source_digest, variable_count):
+    """
+    writes the CNF statements to path in the compiled format,
+    source_digest identifies the FOL sentences they were prepared from
+    """
+    symbol_ids = {}
+    symbols = []
+    statement_offsets = [0]
+    predicate_records = []
+    arguments = []
+    def symbol_id(symbol):
+        if symbol not in symbol_ids:
+            symbol_ids[symbol] = len(symbols)
+            symbols.append(str(symbol))
+        return symbol_ids[symbol]
+    for statement in statements:
+        for predicate in statement.predicate_set:
+            predicate_records.append(PREDICATE_RECORD.pack(symbol_id(predicate.name),
+                len(predicate.arguments) << 1 | predicate.negative, len(arguments)))
+            arguments.extend(symbol_id(argument) for argument in predicate.arguments)
+        statement_offsets.append(len(predicate_records))
+    symbol_offsets = [0]
+    for symbol in symbols:
+        symbol_offsets.append(symbol_offsets[-1] + len(symbol))
+    temporary_path = path + '.tmp'
+    with open(temporary_path, 'wb') as f_compiled:
+        f_compiled.write(HEADER.pack(MAGIC, source_digest, variable_count, len(symbols),
+            len(statement_offsets) - 1, len(predicate_records), len(arguments)))
+        f_compiled.write(pack_integers(symbol_offsets))
+        f_compiled.write(''.join(symbols))
+        f_compiled.write(pack_integers(statement_offsets))
+        f_compiled.write(''.join(predicate_records))
+        f_compiled.write(pack_integers(arguments))
+    os.rename(temporary_path, path)         # readers never see a partly written file
+
+def read_compiled_knowledgebase(path, source_digest):
+    """
+    memory maps a compiled knowledge base and returns the list of
+    its statements and its standard variable count, returns None if
+    the file does not exist or was compiled from other FOL sentences
+    """
+    if not os.path.exists(path):
+        return None
+    with open(path, 'rb') as f_compiled:
+        data = mmap.mmap(f_compiled.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        if len(data) < HEADER.size:
+            return None
+        magic, digest, variable_count, symbol_count, statement_count, predicate_count, argument_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or digest != source_digest:
+            return None
+        offset = HEADER.size
+        symbol_offsets = unpack_integers(data, offset, symbol_count + 1)
+        offset += 4 * (symbol_count + 1)
+        symbols = [intern_symbol(data[offset+symbol_offsets[index]:offset+symbol_offsets[index+1]]) for index in xrange(symbol_count)]
+        offset += symbol_offsets[-1]
+        statement_offsets = unpack_integers(data, offset, statement_count + 1)
+        offset += 4 * (statement_count + 1)
+        records = unpack_integers(data, offset, 3 * predicate_count)
+        offset += PREDICATE_RECORD.size * predicate_count
+        argument_ids = unpack_integers(data, offset, argument_count)
+    finally:
+        data.close()
+    predicates = []
+    for index in xrange(0, len(records), 3):
+        arity = records[index+1] >> 1
+        start = records[index+2]
+        predicates.append(make_predicate(bool(records[index+1] & 1), symbols[records[index]],
+            tuple([symbols[symbol] for symbol in argument_ids[start:start+arity]])))
+    statements = [Statement(predicate_set=predicates[statement_offsets[index]:statement_offsets[index+1]])
+        for index in xrange(statement_count)]
+    return statements, variable_count
+
+def pack_integers(integers):
+    """
+    returns integers as little endian uint32 bytes
+    """
+    packed = array.array('I', integers)
+    if sys.byteorder == 'big':
+        packed.byteswap()
+    return packed.tostring()
+
+def unpack_integers(data, offset, count):
+    """
+    returns count little endian uint32 integers read from data at offset
+    """
+    unpacked = array.array('I')
+    unpacked.fromstring(data[offset:offset+4*count])
+    if sys.byteorder == 'big':
+        unpacked.byteswap()
+    return unpacked
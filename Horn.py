@@ -0,0 +1,268 @@
+from Unification import Variable, Bindings, is_variable
+from Answers import query_variables
+import Trace
+
+BUDGET_CHECK_INTERVAL = 64      #number of tables completed (or rule bodies matched) between two checks of the budget of a proof
+
+class HornProver(object):
+    """
+    proves queries against a knowledge base of Horn statements (at most
+    one positive predicate each) by tabled backward chaining, the
+    knowledge base together with the negated query is unsatisfiable
+    exactly when the body of one of its goal statements (statements
+    without a positive predicate) can be derived from its definite
+    statements, every subgoal called while deriving a body gets a
+    table of its answers and the tables are completed to a fixpoint,
+    which terminates as predicates have no function symbols
+    member variables include:
+    horn : False while a non Horn statement is in the knowledge base
+    non_horn : number of non Horn statements added and not removed
+    rules : maps (predicate symbol, arity) of a head to a list of
+    (head arguments, body) where body is a list of (symbol, arguments)
+    goals : list of bodies of the goal statements
+    statement_rules : maps an added statement to its rule, so it is
+    removed with the body in the order it was added
+    materialization : Materialization of rules made by its user, dropped
+    when a statement is added or removed (or None)
+    """
+    def __init__(self, statements=()):
+        self.non_horn = 0
+        self.rules = {}
+        self.goals = []
+        self.statement_rules = {}
+        self.materialization = None
+        for statement in statements:
+            self.add(statement)
+
+    @property
+    def horn(self):
+        return self.non_horn == 0
+
+    def add(self, statement):
+        """
+        adds a knowledge base statement to the head index
+        """
+        self.materialization = None
+        rule = statement_to_rule(statement)
+        self.statement_rules[statement] = rule
+        if rule is None:
+            self.non_horn += 1
+        elif rule[0] is None:
+            self.goals.append(rule[1])
+        else:
+            head, body = rule
+            key = (head[0], len(head[1]))
+            if key in self.rules:
+                self.rules[key].append((head[1], body))
+            else:
+                self.rules[key] = [(head[1], body)]
+
+    def remove(self, statement):
+        """
+        removes a statement added before from the head index
+        """
+        self.materialization = None
+        rule = self.statement_rules.pop(statement)
+        if rule is None:
+            self.non_horn -= 1
+        elif rule[0] is None:
+            self.goals.remove(rule[1])
+        else:
+            head, body = rule
+            key = (head[0], len(head[1]))
+            self.rules[key].remove((head[1], body))
+            if not self.rules[key]:
+                del self.rules[key]
+
+    def prove(self, query, budget=None):
+        """
+        query is the statement of the negated query, returns True
+        if the knowledge base and query are unsatisfiable, returns
+        None if the Budget budget is exceeded before the fixpoint
+        """
+        head, body = statement_to_rule(query)
+        goals = self.goals
+        derivation = Derivation(self.rules, budget)
+        if head is None:
+            goals = goals + [body]
+        else:
+            derivation.extra_rules[(head[0], len(head[1]))] = [(head[1], body)]
+        while True:
+            if derivation.exceeded():
+                return None
+            if Trace.TRACE is not None:
+                Trace.TRACE.count('horn_rounds')
+                Trace.TRACE.append('horn_tables', len(derivation.tables))
+            derivation.changed = False
+            for body in goals:
+                for _ in derivation.solve(body, 0, Bindings()):
+                    return True
+            if not derivation.complete_tables():
+                return None
+            if not derivation.changed:
+                return False
+
+    def answers(self, query, answers, max_answers=None, budget=None):
+        """
+        query is a positive query predicate, adds to the Answers answers
+        the arguments of query of every derivable instance of query, until
+        max_answers are found, returns None if the Budget budget is exceeded
+        before the fixpoint, otherwise True if an answer was found
+        """
+        derivation = Derivation(self.rules, budget)
+        body = [(query.symbol, query.arguments)]
+        while max_answers is None or len(answers) < max_answers:
+            if derivation.exceeded():
+                return None
+            derivation.changed = False
+            for bindings in derivation.solve(body, 0, Bindings()):
+                answers.add([bindings.walk(variable) for variable in query_variables(query)])
+                if max_answers is not None and len(answers) >= max_answers:
+                    break
+            if not derivation.complete_tables():
+                return None
+            if not derivation.changed:
+                break
+        return bool(answers)
+
+class Derivation(object):
+    """
+    state of one proof of the HornProver, kept apart from the
+    prover so one prover can serve several proofs at a time
+    member variables include:
+    rules : rules of the prover
+    extra_rules : rules added for this proof only (the negated query)
+    tables : maps (symbol, variant key of the call) to its Table
+    changed : True if a table or an answer was added in this round
+    budget : Budget of the proof (or None), checked every BUDGET_CHECK_INTERVAL tables
+    """
+    def __init__(self, rules, budget=None):
+        self.rules = rules
+        self.extra_rules = {}
+        self.tables = {}
+        self.changed = False
+        self.variable_count = 0
+        self.budget = budget
+
+    def exceeded(self):
+        """
+        returns True once the budget of the proof is exceeded
+        """
+        return self.budget is not None and (self.budget.exhausted is not None or self.budget.exceeded())
+
+    def complete_tables(self):
+        """
+        completes every table once, returns False if the budget is
+        exceeded first and tables were left incomplete
+        """
+        for count, table in enumerate(self.tables.values()):
+            if count % BUDGET_CHECK_INTERVAL == 0 and self.exceeded():
+                return False
+            self.complete(table)
+        return True
+
+    def complete(self, table):
+        """
+        derives the answers of a table with every rule whose head
+        unifies with the tabled call, using the answers found so far
+        """
+        symbol, call = table.symbol, table.call
+        key = (symbol, len(call))
+        for rules in (self.rules.get(key, ()), self.extra_rules.get(key, ())):
+            for head, body in rules:
+                renaming = {}
+                head = self.rename(head, renaming)
+                body = [(body_symbol, self.rename(arguments, renaming)) for body_symbol, arguments in body]
+                bindings = Bindings()
+                if not bindings.unify_arguments(call, head):
+                    continue
+                for _ in self.solve(body, 0, bindings):
+                    if table.add_answer(tuple([bindings.walk(argument) for argument in call])):
+                        self.changed = True
+
+    def solve(self, body, index, bindings):
+        """
+        yields bindings once for every way the predicates of body from
+        index onwards are derived by answers of their tables
+        """
+        if index == len(body):
+            yield bindings
+            return
+        symbol, arguments = body[index]
+        call = tuple([bindings.walk(argument) for argument in arguments])
+        key = (symbol, variant_key(call))
+        if key in self.tables:
+            table = self.tables[key]
+        else:
+            table = Table(symbol, call)
+            self.tables[key] = table
+            self.changed = True
+        for answer, has_variables in list(table.answers):
+            if has_variables:
+                answer = self.rename(answer, {})
+            mark = bindings.mark()
+            if bindings.unify_arguments(call, answer):
+                for result in self.solve(body, index+1, bindings):
+                    yield result
+                bindings.undo(mark)
+
+    def rename(self, arguments, renaming):
+        """
+        renames the variables of arguments apart with fresh variables
+        """
+        renamed = []
+        for argument in arguments:
+            if is_variable(argument):
+                if argument not in renaming:
+                    self.variable_count += 1
+                    renaming[argument] = Variable('h' + str(self.variable_count))
+                argument = renaming[argument]
+            renamed.append(argument)
+        return tuple(renamed)
+
+class Table(object):
+    """
+    answers of one tabled call, unique up to variable renaming
+    """
+    def __init__(self, symbol, call):
+        self.symbol = symbol
+        self.call = call
+        self.answers = []
+        self.keys = set()
+
+    def add_answer(self, answer):
+        """
+        returns True if answer is new to the table
+        """
+        key = variant_key(answer)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        self.answers.append((answer, any(is_variable(argument) for argument in answer)))
+        return True
+
+def variant_key(arguments):
+    """
+    returns arguments with variables numbered by first occurrence,
+    equal for arguments that only differ by variable names
+    """
+    numbering = {}
+    return tuple([numbering.setdefault(argument, len(numbering)) if is_variable(argument) else argument for argument in arguments])
+
+def statement_to_rule(statement):
+    """
+    returns (head, body) for a Horn statement, head is the positive
+    predicate as (symbol, arguments) or None for a goal statement and
+    body lists the negative predicates as (symbol, arguments),
+    returns None if statement has more than one positive predicate
+    """
+    head = None
+    body = []
+    for predicate in statement.predicate_set:
+        if predicate.negative:
+            body.append((predicate.symbol, predicate.arguments))
+        elif head is None:
+            head = (predicate.symbol, predicate.arguments)
+        else:
+            return None
+    return head, body
@@ -0,0 +1,104 @@
+from Predicate import make_predicate
+from Statement import Statement
+from Unification import Variable, Bindings, is_variable
+import Trace
+
+class HyperResolver(object):
+    """
+    positive hyperresolution steps, a nucleus (a statement having
+    negative predicates) is resolved in one step against satellites
+    (statements of positive predicates only), one satellite predicate
+    for each of its negative predicates, under one unifier, and the
+    hyperresolvent keeps the positive predicates of the nucleus and the
+    other predicates of the satellites, so it is positive again and no
+    partially resolved nucleus is ever stored
+    satellites are renamed apart at every use, so one satellite may
+    clash with several predicates of a nucleus
+    member variables include:
+    nuclei : TermIndex over the nuclei (positive statements in it are ignored)
+    satellites : TermIndex over the satellites resolved so far
+    variable_count : number of fresh variables made by renaming
+    """
+    def __init__(self, nuclei, satellites):
+        self.nuclei = nuclei
+        self.satellites = satellites
+        self.variable_count = 0
+
+    def resolvents(self, given):
+        """
+        yields the hyperresolvents in which the satellite given clashes
+        with at least one negative predicate of a nucleus, given must
+        already be in satellites, yields False for the empty statement
+        """
+        nuclei = set()
+        for predicate in given.predicate_set:
+            nuclei.update(self.nuclei.get_complementary_statements(predicate))
+        for nucleus in nuclei:
+            negatives = [predicate for predicate in nucleus.predicate_set if predicate.negative]
+            positives = [predicate for predicate in nucleus.predicate_set if not predicate.negative]
+            for fixed in xrange(len(negatives)):
+                # given clashes with the predicate fixed and with none before it, so every combination is found once
+                order = [fixed] + [index for index in xrange(len(negatives)) if index != fixed]
+                for bindings, rest in self.clash(negatives, order, 0, fixed, given, Bindings(), []):
+                    if Trace.TRACE is not None:
+                        Trace.TRACE.count('hyperresolutions')
+                    substitution = bindings.substitution()
+                    predicates = [predicate.substitute(substitution) for predicate in positives + rest]
+                    if not predicates:
+                        yield False
+                        return
+                    yield Statement(predicate_set=predicates)
+
+    def clash(self, negatives, order, step, fixed, given, bindings, rest):
+        """
+        yields (bindings, rest) once for every way the negative predicates
+        at the positions order[step:] unify with predicates of satellites,
+        rest holds the unresolved predicates of the renamed satellites
+        the predicate fixed comes first in order, so its arguments bound
+        by given narrow the retrieval of the satellites of the others
+        """
+        if step == len(order):
+            yield bindings, rest
+            return
+        index = order[step]
+        predicate = negatives[index]
+        if index == fixed:
+            candidates = (given,)
+        else:
+            # retrieves with the arguments bound by the predicates before, which selects on more constants
+            arguments = tuple([bindings.walk(argument) for argument in predicate.arguments])
+            candidates = self.satellites.get_complementary_statements(make_predicate(True, predicate.name, arguments, predicate.symbol))
+        for satellite in candidates:
+            if index < fixed and satellite == given:
+                continue
+            renamed = self.rename(satellite)
+            for target in renamed:
+                if target.symbol != predicate.symbol or len(target.arguments) != len(predicate.arguments):
+                    continue
+                mark = bindings.mark()
+                if not bindings.unify_arguments(predicate.arguments, target.arguments):
+                    continue
+                length = len(rest)
+                rest.extend(other for other in renamed if other is not target)
+                for result in self.clash(negatives, order, step+1, fixed, given, bindings, rest):
+                    yield result
+                del rest[length:]
+                bindings.undo(mark)
+
+    def rename(self, satellite):
+        """
+        returns the predicates of satellite with its variables renamed apart
+        """
+        renaming = {}
+        for predicate in satellite.predicate_set:
+            for argument in predicate.arguments:
+                if is_variable(argument) and argument not in renaming:
+                    self.variable_count += 1
+                    renaming[argument] = Variable('s' + str(self.variable_count))
+        return [predicate.substitute(renaming) for predicate in satellite.predicate_set]
+
+def is_positive(statement):
+    """
+    returns True if statement has no negative predicate (a satellite)
+    """
+    return not any(predicate.negative for predicate in statement.predicate_set)
@@ -0,0 +1,270 @@
+from Unification import is_variable
+
+class TermIndex(object):
+    """
+    path index over the predicates of a set of statements, used to
+    retrieve the statements that contain a predicate which could
+    unify with the complement of a given predicate
+    an index can be layered over a parent index which it shares
+    without modifying, removals of parent statements are recorded
+    member variables include:
+    paths : maps (predicate name, negative, arity) to an IndexEntry
+    parent : the index this one is layered over (or None)
+    removed : statements of parent removed in this layer
+    """
+    def __init__(self, parent=None):
+        self.paths = {}
+        self.parent = parent
+        self.removed = set()
+
+    def overlay(self):
+        """
+        returns a new empty index layered over the self index,
+        the self index must not change while the overlay is used
+        """
+        return TermIndex(self)
+
+    def add(self, statement):
+        """
+        indexes every predicate of the statement
+        """
+        for predicate in statement.predicate_set:
+            key = (predicate.name, predicate.negative, len(predicate.arguments))
+            if key in self.paths:
+                entry = self.paths[key]
+            else:
+                entry = IndexEntry(key[2])
+                self.paths[key] = entry
+            entry.add(predicate, statement)
+
+    def remove(self, statement):
+        """
+        removes every predicate of the statement from the index
+        """
+        for predicate in statement.predicate_set:
+            key = (predicate.name, predicate.negative, len(predicate.arguments))
+            if key in self.paths:
+                self.paths[key].remove(predicate, statement)
+        if self.parent is not None:
+            self.removed.add(statement)
+
+    def get_complementary_statements(self, predicate):
+        """
+        returns the set of indexed statements having a predicate with
+        the same name and arity but opposite sign whose constant arguments
+        do not clash with the constant arguments of predicate
+        the returned set must not be modified by the caller
+        """
+        key = (predicate.name, not predicate.negative, len(predicate.arguments))
+        statements = EMPTY_SET
+        if key in self.paths:
+            statements = self.paths[key].retrieve(predicate)
+        if self.parent is None:
+            return statements
+        inherited = self.parent.get_complementary_statements(predicate)
+        if inherited and self.removed:
+            inherited = inherited - self.removed
+        if not statements:
+            return inherited
+        if not inherited:
+            return statements
+        return statements | inherited
+
+    def get_statements_with_name(self, name):
+        """
+        returns set of indexed statements having a predicate named name
+        """
+        statements = set()
+        for key, entry in self.paths.iteritems():
+            if key[0] == name:
+                statements |= entry.statements
+        if self.parent is not None:
+            statements |= self.parent.get_statements_with_name(name) - self.removed
+        return statements
+
+    def buckets(self):
+        """
+        returns list of (path key, set of statements) pairs
+        """
+        buckets = {}
+        if self.parent is not None:
+            for key, statements in self.parent.buckets():
+                buckets[key] = statements - self.removed
+        for key, entry in self.paths.iteritems():
+            buckets[key] = buckets.get(key, EMPTY_SET) | entry.statements
+        return buckets.items()
+
+class IndexEntry(object):
+    """
+    statements sharing one (predicate name, negative, arity) path
+    member variables include:
+    statements : all statements on this path
+    constants : for every argument position, maps a constant
+    to the statements having that constant at the position
+    variables : for every argument position, the statements
+    having a variable at the position
+    """
+    def __init__(self, arity):
+        self.statements = set()
+        self.constants = [{} for _ in xrange(arity)]
+        self.variables = [set() for _ in xrange(arity)]
+
+    def add(self, predicate, statement):
+        self.statements.add(statement)
+        for position, arg in enumerate(predicate.arguments):
+            if is_variable(arg):
+                self.variables[position].add(statement)
+            elif arg in self.constants[position]:
+                self.constants[position][arg].add(statement)
+            else:
+                self.constants[position][arg] = set([statement])
+
+    def remove(self, predicate, statement):
+        self.statements.discard(statement)
+        for position, arg in enumerate(predicate.arguments):
+            if is_variable(arg):
+                self.variables[position].discard(statement)
+            elif arg in self.constants[position]:
+                self.constants[position][arg].discard(statement)
+                if not self.constants[position][arg]:
+                    del self.constants[position][arg]
+
+    def retrieve(self, predicate):
+        """
+        intersects, over the constant arguments of predicate, the
+        statements having the same constant or a variable at that position
+        """
+        candidate_sets = []
+        for position, arg in enumerate(predicate.arguments):
+            if is_variable(arg):
+                continue        # a variable unifies with every argument
+            matching = self.constants[position].get(arg, EMPTY_SET)
+            if not self.variables[position]:
+                candidate_sets.append(matching)
+            elif not matching:
+                candidate_sets.append(self.variables[position])
+            else:
+                candidate_sets.append(matching | self.variables[position])
+        if not candidate_sets:
+            return self.statements
+        candidate_sets.sort(key=len)
+        candidates = candidate_sets[0]
+        for candidate_set in candidate_sets[1:]:
+            if not candidates:
+                break
+            candidates = candidates & candidate_set
+        return candidates
+
+EMPTY_SET = frozenset()
+
+class FeatureIndex(object):
+    """
+    feature vector index used for subsumption checks between statements
+    a statement C can subsume a statement D only if every feature of C
+    occurs in D at least as often as in C, so the index returns the
+    statements whose feature vectors are componentwise smaller (forward)
+    or larger (backward) than the one of a given statement
+    like TermIndex it can be layered over a parent index
+    member variables include:
+    postings : maps a feature to {statement : count of the feature}
+    vectors : maps an indexed statement to its feature vector
+    parent : the index this one is layered over (or None)
+    removed : statements of parent removed in this layer
+    """
+    def __init__(self, parent=None):
+        self.postings = {}
+        self.vectors = {}
+        self.parent = parent
+        self.removed = set()
+
+    def overlay(self):
+        """
+        returns a new empty index layered over the self index
+        """
+        return FeatureIndex(self)
+
+    def __len__(self):
+        if self.parent is None:
+            return len(self.vectors)
+        return len(self.vectors) + len(self.parent) - len(self.removed)
+
+    def __contains__(self, statement):
+        if statement in self.vectors:
+            return True
+        return self.parent is not None and statement not in self.removed and statement in self.parent
+
+    def add(self, statement):
+        vector = feature_vector(statement)
+        self.vectors[statement] = vector
+        for feature, count in vector.iteritems():
+            if feature in self.postings:
+                self.postings[feature][statement] = count
+            else:
+                self.postings[feature] = {statement : count}
+
+    def remove(self, statement):
+        if statement not in self.vectors:
+            self.removed.add(statement)         # statement belongs to the parent index
+            return
+        vector = self.vectors.pop(statement)
+        for feature in vector:
+            posting = self.postings[feature]
+            del posting[statement]
+            if not posting:
+                del self.postings[feature]
+
+    def get_subsuming_candidates(self, statement):
+        """
+        returns list of indexed statements that may subsume statement
+        """
+        hits = {}
+        for feature, count in feature_vector(statement).iteritems():
+            if feature not in self.postings:
+                continue
+            for candidate, candidate_count in self.postings[feature].iteritems():
+                if candidate_count <= count:
+                    hits[candidate] = hits.get(candidate, 0) + 1
+        candidates = [candidate for candidate, hit_count in hits.iteritems() if hit_count == len(self.vectors[candidate])]
+        if self.parent is not None:
+            candidates.extend(candidate for candidate in self.parent.get_subsuming_candidates(statement) if candidate not in self.removed)
+        return candidates
+
+    def get_subsumed_candidates(self, statement):
+        """
+        returns set of indexed statements that statement may subsume
+        """
+        candidates = self.get_own_subsumed_candidates(statement)
+        if self.parent is not None:
+            candidates.update(self.parent.get_subsumed_candidates(statement) - self.removed)
+        return candidates
+
+    def get_own_subsumed_candidates(self, statement):
+        vector = feature_vector(statement)
+        postings = []
+        for feature in vector:
+            if feature not in self.postings:
+                return set()
+            postings.append((self.postings[feature], vector[feature]))
+        postings.sort(key=lambda posting: len(posting[0]))
+        candidates = set(candidate for candidate, candidate_count in postings[0][0].iteritems() if candidate_count >= postings[0][1])
+        for posting, count in postings[1:]:
+            if not candidates:
+                break
+            candidates = set(candidate for candidate in candidates if posting.get(candidate, 0) >= count)
+        return candidates
+
+def feature_vector(statement):
+    """
+    returns the feature vector of a statement as a dict mapping
+    (predicate name, negative) and (predicate name, negative, 
+    argument position, constant) features to their number of occurences
+    """
+    vector = {}
+    for predicate in statement.predicate_set:
+        feature = (predicate.name, predicate.negative)
+        vector[feature] = vector.get(feature, 0) + 1
+        for position, arg in enumerate(predicate.arguments):
+            if not is_variable(arg):
+                feature = (predicate.name, predicate.negative, position, arg)
+                vector[feature] = vector.get(feature, 0) + 1
+    return vector
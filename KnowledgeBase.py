@@ -0,0 +1,56 @@
+class KnowledgeBase(object):
+    """
+    set of statements that can be layered over a shared base
+    knowledge base, an overlay records its own additions and 
+    removals and never modifies the base, so one prepared knowledge
+    base can serve every query without being copied
+    member variables include:
+    base : the knowledge base this one is layered over (or None)
+    added : statements added to this layer
+    removed : statements of base removed in this layer
+    """
+    def __init__(self, base=None):
+        self.base = base
+        self.added = set()
+        self.removed = set()
+
+    def overlay(self):
+        """
+        returns a new empty layer over the self knowledge base,
+        the self knowledge base must not change while the overlay is used
+        """
+        return KnowledgeBase(self)
+
+    def __contains__(self, statement):
+        if statement in self.added:
+            return True
+        return self.base is not None and statement not in self.removed and statement in self.base
+
+    def __len__(self):
+        if self.base is None:
+            return len(self.added)
+        return len(self.added) + len(self.base) - len(self.removed)
+
+    def __iter__(self):
+        for statement in self.added:
+            yield statement
+        if self.base is not None:
+            for statement in self.base:
+                if statement not in self.removed and statement not in self.added:
+                    yield statement
+
+    def add(self, statement):
+        if self.base is not None and statement in self.base:
+            self.removed.discard(statement)
+        else:
+            self.added.add(statement)
+
+    def update(self, statements):
+        for statement in statements:
+            self.add(statement)
+
+    def discard(self, statement):
+        if statement in self.added:
+            self.added.discard(statement)
+        elif self.base is not None and statement in self.base:
+            self.removed.add(statement)
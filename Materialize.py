@@ -0,0 +1,244 @@
+from Unification import Variable, Bindings, is_variable
+from Horn import variant_key, BUDGET_CHECK_INTERVAL
+import bisect
+import Trace
+
+"""
+Materialization of the facts derivable from the definite statements
+(one positive predicate each) of a Knowledge base, computed once by
+semi-naive forward chaining: a round only fires the rule bodies that
+use at least one fact derived in the previous round, which is found
+by restricting one body predicate at a time to the facts of that round.
+Derived ground facts are kept in a hash set, so a ground query is
+answered by one lookup.
+"""
+
+class Materialization(object):
+    """
+    closure of the facts derivable from the rules of a HornProver
+    member variables include:
+    tables : maps (predicate symbol, arity) to the FactTable of its facts
+    ground : set of (predicate symbol, arguments) of the derived ground facts
+    complete : False if the closure was stopped at the limit of facts
+    or when the Budget budget was exceeded
+    stopped : True if the closure was stopped by the budget, it may
+    then be made again within a later budget
+    inconsistent : True if the body of a goal statement is derived, the
+    definite statements then contradict the goal statements
+    rounds : number of rounds until the fixpoint
+    """
+    def __init__(self, rules, goals, limit=None, budget=None):
+        self.tables = {}
+        self.ground = set()
+        self.complete = True
+        self.stopped = False
+        self.inconsistent = False
+        self.variable_count = 0
+        self.rounds = 0
+        self.saturate(rules, limit, budget)
+        if self.complete:
+            self.inconsistent = any(True for body in goals for _ in self.solve(body, 0, Bindings(), None, 0))
+
+    def saturate(self, rules, limit, budget):
+        """
+        derives facts round by round until a round derives no new fact
+        or more than limit facts are derived, the budget (unless None)
+        is checked before every rule and every BUDGET_CHECK_INTERVAL
+        matches of rule bodies
+        """
+        steps = 0
+        size = 0
+        for key, key_rules in rules.iteritems():
+            for head, body in key_rules:
+                if not body and self.add(key, head, 0):
+                    size += 1
+        derived = size
+        while derived:
+            self.rounds += 1
+            derived = 0
+            for key, key_rules in rules.iteritems():
+                for head, body in key_rules:
+                    for index in xrange(len(body)):
+                        if not self.derived_in(body[index], self.rounds - 1):
+                            continue
+                        if self.out_of_budget(budget):
+                            return
+                        # body predicate index uses the facts of the previous round, earlier ones older facts
+                        for bindings in self.solve(body, 0, Bindings(), index, self.rounds - 1):
+                            steps += 1
+                            if steps % BUDGET_CHECK_INTERVAL == 0 and self.out_of_budget(budget):
+                                return
+                            if self.add(key, tuple([bindings.walk(argument) for argument in head]), self.rounds):
+                                derived += 1
+                                if limit is not None and size + derived > limit:
+                                    self.complete = False
+                                    return
+            size += derived
+        if Trace.TRACE is not None:
+            Trace.TRACE.count('materialized_facts', size)
+
+    def out_of_budget(self, budget):
+        """
+        returns True if the Budget budget (unless None) is exceeded,
+        the closure is then stopped and not complete
+        """
+        if budget is None or not budget.exceeded():
+            return False
+        self.complete = False
+        self.stopped = True
+        return True
+
+    def derived_in(self, body_predicate, round_number):
+        """
+        returns True if facts of the predicate of body_predicate were derived in round_number
+        """
+        symbol, arguments = body_predicate
+        table = self.tables.get((symbol, len(arguments)))
+        if table is None:
+            return False
+        position = bisect.bisect_left(table.rounds, round_number)       # rounds of facts never decrease
+        return position < len(table.rounds) and table.rounds[position] == round_number
+
+    def add(self, key, arguments, round_number):
+        """
+        adds a derived fact, returns True if it is new
+        """
+        if key in self.tables:
+            table = self.tables[key]
+        else:
+            table = FactTable()
+            self.tables[key] = table
+        ground = not any(is_variable(argument) for argument in arguments)
+        if not table.add(arguments, round_number, ground):
+            return False
+        if ground:
+            self.ground.add((key[0], arguments))
+        return True
+
+    def solve(self, body, index, bindings, delta, delta_round):
+        """
+        yields bindings once for every way the predicates of body from
+        index onwards match derived facts, the predicate at position delta
+        matches the facts of delta_round only, the predicates before it
+        the facts of earlier rounds and the others every fact up to
+        delta_round (every fact when delta is None)
+        """
+        if index == len(body):
+            yield bindings
+            return
+        symbol, arguments = body[index]
+        table = self.tables.get((symbol, len(arguments)))
+        if table is None:
+            return
+        if delta is None:
+            low, high = 0, None
+        elif index == delta:
+            low, high = delta_round, delta_round + 1
+        elif index < delta:
+            low, high = 0, delta_round
+        else:
+            low, high = 0, delta_round + 1
+        call = tuple([bindings.walk(argument) for argument in arguments])
+        for position in table.candidates(call):
+            if table.rounds[position] < low or high is not None and table.rounds[position] >= high:
+                continue
+            fact = table.facts[position]
+            if position in table.general_positions:
+                fact = self.rename(fact)
+            mark = bindings.mark()
+            if bindings.unify_arguments(call, fact):
+                for result in self.solve(body, index+1, bindings, delta, delta_round):
+                    yield result
+                bindings.undo(mark)
+
+    def rename(self, arguments):
+        """
+        renames the variables of a fact apart with fresh variables
+        """
+        renaming = {}
+        renamed = []
+        for argument in arguments:
+            if is_variable(argument):
+                if argument not in renaming:
+                    self.variable_count += 1
+                    renaming[argument] = Variable('m' + str(self.variable_count))
+                argument = renaming[argument]
+            renamed.append(argument)
+        return tuple(renamed)
+
+    def holds(self, predicate):
+        """
+        returns True if the ground predicate is a derived fact or an
+        instance of a derived fact with variables
+        """
+        if (predicate.symbol, predicate.arguments) in self.ground:
+            return True
+        table = self.tables.get((predicate.symbol, len(predicate.arguments)))
+        if table is None:
+            return False
+        for position in table.general:
+            if Bindings().unify_arguments(predicate.arguments, self.rename(table.facts[position])):
+                return True
+        return False
+
+class FactTable(object):
+    """
+    derived facts of one (predicate symbol, arity)
+    member variables include:
+    facts : derived argument tuples in derivation order
+    rounds : round in which each fact was derived
+    keys : variant keys of facts, so facts are unique up to variable renaming
+    index : maps (argument position, constant) to the positions in facts
+    of the ground facts with that constant at that argument position
+    general : positions in facts of the facts with variables
+    general_positions : set of the positions in general
+    """
+    def __init__(self):
+        self.facts = []
+        self.rounds = []
+        self.keys = set()
+        self.index = {}
+        self.general = []
+        self.general_positions = set()
+
+    def add(self, arguments, round_number, ground):
+        """
+        returns True if the fact arguments is new to the table
+        """
+        key = variant_key(arguments)
+        if key in self.keys:
+            return False
+        self.keys.add(key)
+        position = len(self.facts)
+        self.facts.append(arguments)
+        self.rounds.append(round_number)
+        if not ground:
+            self.general.append(position)
+            self.general_positions.add(position)
+            return True
+        for argument_position, argument in enumerate(arguments):
+            index_key = (argument_position, argument)
+            if index_key in self.index:
+                self.index[index_key].append(position)
+            else:
+                self.index[index_key] = [position]
+        return True
+
+    def candidates(self, call):
+        """
+        returns the positions of the facts that may unify with call, the
+        ground facts sharing its most selective constant and the facts
+        with variables
+        """
+        best = None
+        for argument_position, argument in enumerate(call):
+            if is_variable(argument):
+                continue
+            positions = self.index.get((argument_position, argument), ())
+            if best is None or len(positions) < len(best):
+                best = positions
+        if best is None:
+            return xrange(len(self.facts))
+        if not self.general:
+            return best
+        return list(best) + self.general
@@ -1,103 +1,175 @@
-class Predicate():
-    """
-    defines one predicate and the operations allowed on them
-    member variables include:
-    negative : True if predicate is negated
-    name : the name of the predicate
-    predicate_string : the unparsed predicate string
-    arguments : list of predicate arguments
-    """
-    def __init__(self, predicate):
-        """
-        predicate should be of the form : ~A(x,y,John)
-        negative : True if predicate is negated
-        name : predicate name
-        arguments : list of arguments
-        """
-        split_predicate = predicate.split('(')
-        self.negative = False
-        self.name = split_predicate[0]
-        self.predicate_string = predicate
-        if '~' in split_predicate[0]:
-            self.name = split_predicate[0][1:]
-            self.negative = True
-        parameters = split_predicate[1][:-1]        # remove closing parenthesis
-        self.arguments = parameters.split(',')
-        variable_prefix = self.name[0].lower()
-
-    def __str__(self):
-        return '~'[not self.negative:] + self.name + '(' + ','.join(self.arguments) + ')'
-
-    def negate(self):
-        """
-        to negate a predicate
-        """
-        self.negative = not self.negative
-        self.update_predicate_string()
-
-    def __eq__(self, predicate):
-        return self.__dict__ == predicate.__dict__
-
-    def __hash__(self):
-        return hash((self.predicate_string))
-
-    def unify_with_predicate(self, predicate):
-        """
-        returns substitution if the self predicate object
-        unifies successfully with predicate argument else 
-        returns False if cannot be unified
-        """
-        if self.name == predicate.name and len(self.arguments) == len(predicate.arguments):
-            substitution = {}
-            return unify(self.arguments, predicate.arguments, substitution)
-        else:
-            return False
-
-    def update_predicate_string(self):
-        """
-        reconstructs predicate string
-        """
-        self.predicate_string = '~'[not self.negative:] + self.name + '(' + ','.join(self.arguments) + ')'
-
-    def substitute(self, substitution):
-        """
-        substitues 'substitution' in the self predicate 
-        object obtained as a result of unification of 
-        this predicate with another
-        """
-        if substitution:
-            for index, arg in enumerate(self.arguments):
-                if arg in substitution:
-                    self.arguments[index] = substitution[arg]
-            self.update_predicate_string()
-        return self
-
-def unify(predicate1_arg, predicate2_arg, substitution):
-    """
-    unifies two predicates and returns the substitution
-    returns false if predicates cannot be unified
-    """
-    if substitution == False:
-        return False
-    elif predicate1_arg == predicate2_arg:
-        return substitution
-    elif isinstance(predicate1_arg, str) and predicate1_arg.islower():
-        return unify_var(predicate1_arg, predicate2_arg, substitution)
-    elif isinstance(predicate2_arg, str) and predicate2_arg.islower():
-        return unify_var(predicate2_arg, predicate1_arg, substitution)
-    elif isinstance(predicate1_arg, list) and isinstance(predicate2_arg, list):
-        if predicate1_arg and predicate2_arg:
-            return unify(predicate1_arg[1:], predicate2_arg[1:], unify(predicate1_arg[0], predicate2_arg[0], substitution))
-        else:
-            return substitution
-    else:
-        return False
-
-def unify_var(var, x, substitution):
-    if var in substitution:
-        return unify(substitution[var], x, substitution)
-    elif x in substitution:
-        return unify(var, substitution[x], substitution)
-    else:
-        substitution[var] = x
-        return substitution
\ No newline at end of file
+from Unification import Variable, is_variable, unify
+import threading
+
+class SymbolTable(object):
+    """
+    interns symbol strings, every distinct symbol is mapped
+    to a small integer id and to one shared string object,
+    lowercase symbols are stored as Variable objects, ids are
+    allocated under lock so threads never get the same id for two symbols
+    member variables include:
+    ids : maps symbol string to its integer id
+    symbols : list of interned symbol strings indexed by id
+    lock : serializes the allocation of ids
+    """
+    def __init__(self):
+        self.ids = {}
+        self.symbols = []
+        self.lock = threading.Lock()
+
+    def intern(self, symbol):
+        """
+        returns the integer id of symbol, allocating one if needed
+        """
+        symbol_id = self.ids.get(symbol)
+        if symbol_id is not None:
+            return symbol_id
+        with self.lock:
+            if symbol in self.ids:
+                return self.ids[symbol]         # allocated by another thread meanwhile
+            symbol_id = len(self.symbols)
+            if symbol.islower():
+                self.symbols.append(Variable(symbol))       # lowercase arguments are variables
+            else:
+                self.symbols.append(intern(symbol))
+            self.ids[symbol] = symbol_id        # set last, so the symbol of a visible id is there
+            return symbol_id
+
+    def __getitem__(self, symbol_id):
+        return self.symbols[symbol_id]
+
+SYMBOLS = SymbolTable()         #predicate names and constants of all predicates
+
+class Predicate(object):
+    """
+    defines one predicate and the operations allowed on them
+    predicates are immutable, operations return new predicates
+    member variables include:
+    negative : True if predicate is negated
+    name : the name of the predicate (interned string)
+    symbol : integer id of name in SYMBOLS
+    arguments : tuple of predicate arguments (interned strings)
+    predicate_string : the unparsed predicate string
+    """
+    __slots__ = ('negative', 'name', 'symbol', 'arguments', 'hash', '_string')
+
+    def __init__(self, predicate):
+        """
+        predicate should be of the form : ~A(x,y,John)
+        negative : True if predicate is negated
+        name : predicate name
+        arguments : tuple of arguments
+        """
+        split_predicate = predicate.split('(')
+        negative = split_predicate[0].startswith('~')
+        name = split_predicate[0][1:] if negative else split_predicate[0]
+        parameters = split_predicate[1][:-1]        # remove closing parenthesis
+        init_predicate(self, negative, name, tuple(map(intern_symbol, parameters.split(','))))
+        self._string = predicate
+
+    @property
+    def predicate_string(self):
+        if self._string is None:
+            self._string = '~'[not self.negative:] + self.name + '(' + ','.join(self.arguments) + ')'
+        return self._string
+
+    def __str__(self):
+        return self.predicate_string
+
+    def __repr__(self):
+        return 'Predicate(%r)' % self.predicate_string
+
+    def __reduce__(self):
+        return (Predicate, (self.predicate_string,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo):
+        return self
+
+    def negate(self):
+        """
+        returns the negation of the predicate
+        """
+        return make_predicate(not self.negative, self.name, self.arguments, self.symbol)
+
+    def __eq__(self, predicate):
+        return self is predicate or (self.hash == predicate.hash and self.symbol == predicate.symbol
+            and self.negative == predicate.negative and self.arguments == predicate.arguments)
+
+    def __ne__(self, predicate):
+        return not self.__eq__(predicate)
+
+    def __hash__(self):
+        return self.hash
+
+    def unify_with_predicate(self, predicate):
+        """
+        returns substitution if the self predicate object
+        unifies successfully with predicate argument else 
+        returns False if cannot be unified
+        """
+        return unify(self, predicate)
+
+    def match_predicate(self, predicate, substitution):
+        """
+        one way unification, returns 'substitution' extended so
+        that the self predicate object becomes equal to predicate
+        only variables of the self predicate are bound
+        returns False if predicate is not an instance of self
+        """
+        if self.negative != predicate.negative or self.symbol != predicate.symbol or len(self.arguments) != len(predicate.arguments):
+            return False
+        substitution = dict(substitution)
+        for arg1, arg2 in zip(self.arguments, predicate.arguments):
+            if is_variable(arg1):
+                if arg1 not in substitution:
+                    substitution[arg1] = arg2
+                elif substitution[arg1] != arg2:
+                    return False
+            elif arg1 != arg2:
+                return False
+        return substitution
+
+    def substitute(self, substitution):
+        """
+        returns the predicate obtained by substituting 'substitution'
+        (an idempotent substitution obtained as a result of unification)
+        in every argument of the self predicate object, or self when no
+        argument is affected so unchanged predicates are shared
+        """
+        if substitution:
+            arguments = tuple([substitution.get(arg, arg) for arg in self.arguments])
+            if arguments != self.arguments:
+                return make_predicate(self.negative, self.name, arguments, self.symbol)
+        return self
+
+def intern_symbol(symbol):
+    """
+    returns the shared string (or Variable) object of symbol held by SYMBOLS
+    """
+    return SYMBOLS[SYMBOLS.intern(symbol)]
+
+def init_predicate(predicate, negative, name, arguments, symbol=None):
+    """
+    sets the slots of a new predicate object, the hash
+    is computed once here as predicates never change
+    """
+    if symbol is None:
+        symbol = SYMBOLS.intern(name)
+    predicate.negative = negative
+    predicate.name = SYMBOLS[symbol]
+    predicate.symbol = symbol
+    predicate.arguments = arguments
+    predicate.hash = hash((symbol, negative, arguments))
+    predicate._string = None
+
+def make_predicate(negative, name, arguments, symbol=None):
+    """
+    builds a predicate from its parts without parsing a
+    predicate string, arguments must be a tuple of strings
+    """
+    predicate = Predicate.__new__(Predicate)
+    init_predicate(predicate, negative, name, arguments, symbol)
+    return predicate
@@ -0,0 +1,168 @@
+import hashlib
+import sqlite3
+from Unification import is_variable
+
+class ProofCache(object):
+    """
+    results of proved queries stored in an sqlite database on disk,
+    keyed by the fingerprint of the CNF knowledge base they were proved
+    against and the normalized query, so a changed knowledge base
+    never hits the results of the old one, the least recently used
+    results are evicted when more than max_entries are stored
+    member variables include:
+    hits : number of queries answered from the cache
+    misses : number of queries not found in the cache
+    """
+    def __init__(self, path, max_entries):
+        self.connection = sqlite3.connect(path)
+        self.connection.execute('CREATE TABLE IF NOT EXISTS results (kb TEXT, query TEXT, result INTEGER, '
+            'last_used INTEGER, PRIMARY KEY (kb, query))')
+        self.connection.execute('CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used)')
+        self.max_entries = max_entries
+        self.size, self.clock = self.connection.execute('SELECT COUNT(*), MAX(last_used) FROM results').fetchone()
+        self.clock = self.clock or 0
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, fingerprint, query):
+        """
+        returns the cached result of query, None if not cached
+        """
+        query = normalize_query(query)
+        row = self.connection.execute('SELECT result FROM results WHERE kb = ? AND query = ?', (fingerprint, query)).fetchone()
+        if row is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        self.clock += 1
+        self.connection.execute('UPDATE results SET last_used = ? WHERE kb = ? AND query = ?', (self.clock, fingerprint, query))
+        return bool(row[0])
+
+    def put(self, fingerprint, query, result):
+        """
+        stores the result of query, evicting the least recently
+        used results beyond max_entries
+        """
+        self.clock += 1
+        cursor = self.connection.execute('INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)',
+            (fingerprint, normalize_query(query), int(bool(result)), self.clock))
+        self.size += cursor.rowcount
+        if self.size > self.max_entries:
+            self.connection.execute('DELETE FROM results WHERE rowid IN (SELECT rowid FROM results ORDER BY last_used LIMIT ?)',
+                (self.size - self.max_entries,))
+            self.size = self.max_entries
+
+    def close(self):
+        self.connection.commit()
+        self.connection.close()
+
+def knowledge_base_fingerprint(statements, settings=''):
+    """
+    returns a digest of the CNF statements that does not depend on
+    their order or on the names of their variables, settings is
+    mixed in so results of differently configured provers are kept apart
+    """
+    digest = hashlib.sha1(settings)
+    for statement_string in sorted(canonical_statement_string(statement) for statement in statements):
+        digest.update(statement_string)
+        digest.update('&')
+    return digest.hexdigest()
+
+def canonical_statement_string(statement):
+    """
+    returns the statement string with its predicates in a fixed
+    order and its variables numbered by first occurrence, the order
+    does not depend on the symbol ids or the names of the variables,
+    so every variant of a statement gets the same string
+    """
+    classes = variable_classes(statement.predicate_set)
+    if not classes:
+        predicates = sorted(statement.predicate_set, key=lambda predicate: (predicate.negative, predicate.name, predicate.arguments))
+        return '|'.join(canonical_predicate_string(predicate, {}) for predicate in predicates)      # ground statements have no ties
+    return '|'.join(canonical_order(list(statement.predicate_set), {}, classes))
+
+def canonical_order(predicates, numbering, classes):
+    """
+    returns the predicate strings of predicates in the order giving the
+    smallest string, the next predicate is the one of smallest
+    canonical_key and the predicates tied on it are each tried next,
+    numbering holds the numbers of the variables of the predicates before
+    """
+    if not predicates:
+        return []
+    keys = [canonical_key(predicate, numbering, classes) for predicate in predicates]
+    smallest = min(keys)
+    best = None
+    for index, predicate in enumerate(predicates):
+        if keys[index] != smallest:
+            continue
+        predicate_numbering = dict(numbering)
+        strings = [canonical_predicate_string(predicate, predicate_numbering)]
+        strings.extend(canonical_order(predicates[:index] + predicates[index+1:], predicate_numbering, classes))
+        if best is None or strings < best:
+            best = strings
+    return best
+
+def canonical_key(predicate, numbering, classes):
+    """
+    returns the sort key of predicate after the predicates numbering
+    holds, constants sort by name, numbered variables by number and the
+    other variables by class and by first occurrence in predicate
+    """
+    arguments = []
+    fresh = {}
+    for argument in predicate.arguments:
+        if not is_variable(argument):
+            arguments.append((0, argument))
+        elif argument in numbering:
+            arguments.append((1, numbering[argument]))
+        else:
+            arguments.append((2, classes[argument], fresh.setdefault(argument, len(fresh))))
+    return (predicate.negative, predicate.name, tuple(arguments))
+
+def variable_classes(predicates):
+    """
+    returns a dict mapping every variable of predicates to a class
+    number, variables of one class occur in the same places of the
+    same kind of predicates, classes are refined from the positions of
+    a variable until they no longer split
+    """
+    classes = {}
+    for predicate in predicates:
+        for argument in predicate.arguments:
+            if is_variable(argument):
+                classes[argument] = 0
+    count = 1
+    while classes:
+        occurrences = dict((variable, []) for variable in classes)
+        for predicate in predicates:
+            pattern = tuple([(1, classes[argument]) if is_variable(argument) else (0, argument) for argument in predicate.arguments])
+            for position, argument in enumerate(predicate.arguments):
+                if is_variable(argument):
+                    occurrences[argument].append((predicate.negative, predicate.name, position, pattern))
+        signatures = dict((variable, (classes[variable], tuple(sorted(found)))) for variable, found in occurrences.iteritems())
+        numbers = dict((signature, number) for number, signature in enumerate(sorted(set(signatures.itervalues()))))
+        classes = dict((variable, numbers[signature]) for variable, signature in signatures.iteritems())
+        if len(numbers) == count:
+            break
+        count = len(numbers)
+    return classes
+
+def canonical_predicate_string(predicate, numbering):
+    """
+    returns the predicate string with variables renamed to _0, _1, ...
+    in order of first occurrence, numbering is shared across the
+    predicates of one statement
+    """
+    arguments = []
+    for argument in predicate.arguments:
+        if is_variable(argument):
+            argument = '_' + str(numbering.setdefault(argument, len(numbering)))
+        arguments.append(argument)
+    return '~'[not predicate.negative:] + predicate.name + '(' + ','.join(arguments) + ')'
+
+def normalize_query(query):
+    """
+    returns the query predicate string with canonical variable names
+    """
+    return canonical_predicate_string(query, {})
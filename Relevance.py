@@ -0,0 +1,84 @@
+"""
+Relevance slicing of the Knowledge base, in the manner of SInE: a
+statement is relevant to a query when it has a predicate complementary
+to a predicate of the negated query or of another relevant statement,
+so only relevant statements can take part in a resolution proof that
+starts from the negated query. The slice of depth N holds the statements
+reached in at most N such steps, the slice of unlimited depth holds all
+of them, and it is complete once a step reaches no new predicate.
+"""
+
+class RelevanceGraph(object):
+    """
+    predicate connection graph of the statements of a Knowledge base,
+    the nodes are (predicate name, negative, arity) keys and two keys are
+    linked when one statement has predicates of both, so a slice is
+    found by walking keys and only its statements are collected
+    member variables include:
+    statements : maps a key to the set of statements having a predicate of the key
+    links : maps a key to {linked key : number of statements having both}
+    """
+    def __init__(self):
+        self.statements = {}
+        self.links = {}
+
+    def add(self, statement):
+        keys = statement_keys(statement)
+        for key in keys:
+            if key in self.statements:
+                self.statements[key].add(statement)
+            else:
+                self.statements[key] = set([statement])
+                self.links[key] = {}
+            links = self.links[key]
+            for linked in keys:
+                links[linked] = links.get(linked, 0) + 1
+
+    def remove(self, statement):
+        keys = statement_keys(statement)
+        for key in keys:
+            if key not in self.statements or statement not in self.statements[key]:
+                continue
+            self.statements[key].discard(statement)
+            if not self.statements[key]:
+                del self.statements[key]
+                del self.links[key]
+                continue
+            links = self.links[key]
+            for linked in keys:
+                links[linked] -= 1
+                if not links[linked]:
+                    del links[linked]
+
+    def relevant(self, statement, depth=None):
+        """
+        returns (set of statements, complete) where the set holds the
+        statements relevant to statement (the negated query) within
+        depth steps, None for no limit, and complete is True if no
+        further step would add a statement
+        """
+        reached = set(statement_keys(statement))
+        frontier = set(reached)
+        statements = set()
+        steps = 0
+        while frontier and (depth is None or steps < depth):
+            steps += 1
+            next_frontier = set()
+            for key in frontier:
+                complement = (key[0], not key[1], key[2])
+                if complement not in self.statements:
+                    continue
+                statements.update(self.statements[complement])
+                for linked in self.links[complement]:
+                    if linked not in reached:
+                        reached.add(linked)
+                        next_frontier.add(linked)
+            frontier = next_frontier
+        complete = not any((key[0], not key[1], key[2]) in self.statements for key in frontier)
+        return statements, complete
+
+def statement_keys(statement):
+    """
+    returns the set of (predicate name, negative, arity) keys of statement
+    """
+    return set((predicate.name, predicate.negative, len(predicate.arguments)) for predicate in statement.predicate_set)
@@ -1,441 +1,1295 @@
-from Predicate import *
-from Statement import *
-import re
-import copy
-UPPER_ALPHA_MAPPING = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z']
-LOWER_ALPHA_MAPPING = ['a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u','v','w','x','y','z']
-OPERATOR_PRIORITY = {'~':4, '&':3, '|':2, '=>':1}       #~: Not, &: And, |: Or, =>: Implication
-traversal = ''
-predicates_dict = {}            #maintains predicates to constant mapping for a FOL statement
-STANDARD_VARIABLE_COUNT = 0     #maintains a count of standardized variables 
-TRUE = 'TRUE'
-FALSE = 'FALSE'
-INPUT_FILE = 'input.txt'
-OUTPUT_FILE = 'output.txt'
-KILL_LIMIT = 8000               #kills the resolution inference when Knowledge base size exceeds KILL_LIMIT
-KNOWLEDGE_BASE_HASH = {}
-KNOWLEDGE_BASE = set()
-"""
-Structure of KNOWLEDGE_BASE_HASH:
-{
-    "Predicate_Name" : set(statement_1, statement_2 ...) - that is set of statements objects
-}
-
-Structure of KNOWLEDGE_BASE:
-set([
-    Statement Object 1,
-    Statement Object 2,
-    ...
-])
-"""
-
-class Node():
-    """
-    An object of this class is used to hold one predicate
-    of a statement, used to construct a statement tree
-    while parsing a statement and converting it to CNF.
-    """
-    def __init__(self, value):
-        self.value = value
-        self.negation = False
-        self.operator = True
-        self.left = None
-        self.right = None
-        if value in predicates_dict:
-            if '~' in predicates_dict[value]:
-                self.negation = True
-                predicates_dict[value] = predicates_dict[value][1:]
-            self.operator = False
-
-def inorder_traversal(node):
-    global traversal
-    traversal = ''
-    inorder(node)
-    return traversal
-
-def inorder(node):
-    global traversal
-    if node:
-        inorder(node.left)
-        if node.negation:
-            traversal += '~' + node.value
-        else:
-            traversal += node.value
-        inorder(node.right)
-
-def give_constant(count, uppercase):
-    """
-    count >= 0
-    uppercase : if True then constant begin from AA, else from aa
-    returns a string constant for count value
-    """
-    start = count + 26
-    str_constant = ''
-    while start >= 26:
-        val = start % 26
-        if uppercase:
-            str_constant = UPPER_ALPHA_MAPPING[val] + str_constant
-        else:
-            str_constant = LOWER_ALPHA_MAPPING[val] + str_constant
-        start //= 26
-    if uppercase:
-        str_constant = UPPER_ALPHA_MAPPING[start-1] + str_constant
-    else:
-        str_constant = LOWER_ALPHA_MAPPING[start-1] + str_constant
-    return str_constant
-
-def distribute_and_over_or(node):
-    """
-    distributes and over or in the step
-    of converting an FOL statement to CNF
-    """
-    if node:
-        if node.value == '|':
-            if node.left.value == '&' and node.right.value == '&':      # OR as parent, two AND as its children
-                left_and = node.left
-                right_and = node.right
-                a = left_and.left
-                b = left_and.right
-                c = right_and.left
-                d = right_and.right
-                a_copy = copy.deepcopy(a)
-                b_copy = copy.deepcopy(b) 
-                c_copy = copy.deepcopy(c)
-                d_copy = copy.deepcopy(d)
-                left_or_1 = Node('|')
-                left_or_2 = Node('|')
-                right_or_1 = Node('|')
-                right_or_2 = Node('|')
-                node.value = '&'
-                left_and.left = left_or_1
-                left_and.right = left_or_2
-                right_and.left = right_or_1
-                right_and.right = right_or_2
-                left_or_1.left = a
-                left_or_1.right = c
-                left_or_2.left = a_copy
-                left_or_2.right = d
-                right_or_1.left = b
-                right_or_1.right = c_copy
-                right_or_2.left = b_copy
-                right_or_2.right = d_copy
-            elif node.left.operator and not node.right.operator and node.left.value == '&':
-                c = node.left.right
-                a = node.right
-                a_copy = copy.deepcopy(a)
-                right_or = Node('|')
-                node.value = '&'
-                node.left.value = '|'
-                node.left.right = a
-                node.right = right_or
-                right_or.left = c
-                right_or.right = a_copy
-            elif not node.left.operator and node.right.operator and node.right.value == '&':
-                a = node.left
-                a_copy = copy.deepcopy(a)
-                b = node.right.left
-                left_or = Node('|')
-                node.value = '&'
-                node.right.value = '|'
-                node.left = left_or
-                left_or.left = a
-                left_or.right = b
-                node.right.left = a_copy
-        distribute_and_over_or(node.left)
-        distribute_and_over_or(node.right)
-
-def propagate_negation(node):
-    """
-    moves negation inside and hence applies De Morgans law
-    """
-    if node:
-        if node.operator and node.negation:
-            node.left.negation = not node.left.negation
-            node.right.negation = not node.right.negation
-            if node.value == '&':
-                node.value = '|'
-            else:
-                node.value = '&'
-            node.negation = False
-        propagate_negation(node.left)
-        propagate_negation(node.right)
-
-def remove_implication(node):
-    """
-    A=>B is equivalent to ~A|B
-    thus this method performs implication removal
-    """
-    if node:
-        remove_implication(node.left)
-        if node.operator and node.value == '=>':
-            node.value = '|'
-            node.left.negation = not node.left.negation
-        remove_implication(node.right)        
-
-def convert_postfix_to_tree(statement):
-    """
-    parses postfix representation of a statement and
-    converts it to tree notation, where leaf nodes 
-    are predicate nodes and internal nodes are operators
-    """
-    stack = []
-    r = re.compile('(~|&|\||=>|[A-Z][A-Z])')
-    predicates = r.findall(statement)
-    for token in predicates:
-        if token in ['&', '|', '=>']:
-            operand2 = stack.pop()
-            operand1 = stack.pop()
-            operator = Node(token)
-            operator.left = operand1
-            operator.right = operand2
-            stack.append(operator)
-        elif token == '~':
-            stack[-1].negation = not stack[-1].negation
-        else:
-            operand = Node(token)
-            stack.append(operand)
-    return stack[0]
-
-def convert_to_postfix(statement):
-    """
-    implementation of Shunting-Yard Algorithm
-    to convert a infix statement to postfix statement
-    """
-    stack = []
-    r = re.compile('(~|&|\||=>|[A-Z][A-Z]|\(|\))')
-    predicates = r.findall(statement)
-    postfix = ''
-    for token in predicates:
-        if re.match('[A-Z][A-Z]', token):
-            postfix += token
-        elif token in ['~', '&', '|', '=>']:
-            while len(stack) != 0 and stack[-1] not in ['(', ')'] and OPERATOR_PRIORITY[stack[-1]] >= OPERATOR_PRIORITY[token]:
-                postfix += stack.pop()
-            stack.append(token)
-        elif token == '(':
-            stack.append(token)
-        elif token == ')':
-            while stack[-1] != '(':
-                postfix += stack.pop()
-            stack.pop()
-    while stack:
-        postfix += stack.pop()
-    return postfix
-
-def replace_predicate_by_constant(statement):
-    """
-    replaces a predicate string by a string 
-    constant of length 2, for easy parsing
-    ex: Mother(x,y) can be replaced by AB
-    """
-    r = re.compile('~?[A-Z][A-Za-z]*\([a-zA-Z][a-zA-Z,]*\)')
-    predicates = r.findall(statement)
-    predicates_dict = {}
-    for index, predicate in enumerate(set(predicates)):
-        predicate_constant = give_constant(index, True)
-        predicates_dict[predicate_constant] = predicate
-        statement = statement.replace(predicate, predicate_constant)
-    return statement, predicates_dict
-    
-def replace_constant_by_predicate(statement, predicates_dict):
-    """
-    restores predicate string in place of constants 
-    for getting the original statement back
-    """
-    for key, value in predicates_dict.iteritems():
-        statement = statement.replace(key, value)
-    return statement
-
-def standardize_variables(statements):
-    """
-    takes list of CNF statements strings as argument 
-    return them as list of standardized CNF statements,
-    standardizes the variables for all the statements
-    """
-    global STANDARD_VARIABLE_COUNT
-    standard_statements = []
-    for statement in statements:
-        variable_dict = {}
-        r = re.compile('\([a-zA-Z,]+\)')
-        parameters = r.findall(statement)
-        parameters = map(lambda x:x[1:-1], parameters)
-        parameters = ','.join(parameters)
-        parameters = parameters.split(',')
-        parameters = filter(lambda x: x.islower(), parameters)
-        parameters = list(set(parameters))
-        for para in parameters:
-            variable_dict[para] = give_constant(STANDARD_VARIABLE_COUNT, False)
-            STANDARD_VARIABLE_COUNT += 1
-        predicates = statement.split('|')
-        predicate_list = []
-        for predicate in predicates:
-            parts = predicate.split('(')
-            parameters = parts[1][:-1].split(',')
-            parameters = map(lambda x:variable_dict[x] if x in variable_dict else x, parameters)
-            predicate = parts[0] + '(' + ','.join(parameters) + ')'
-            predicate_list.append(predicate)
-        standard_statements.append('|'.join(predicate_list))
-    return standard_statements
-            
-
-def init_problem():
-    """
-    Parses the Query statements and the Knowledge base
-    statements from the input file and returns them
-    """
-    QUERIES = []
-    FOL_SENTENCES = []
-    with open(INPUT_FILE) as f_input:
-        file = list(f_input)
-    f_input.close()
-    NO_OF_QUERIES = int(file[0].rstrip('\n'))
-    for query_line in file[1:1+NO_OF_QUERIES]:
-        query_line = query_line.rstrip()
-        query_line = query_line.replace(' ','')
-        query_line = query_line.replace('\t','')
-        QUERIES.append(Predicate(query_line))
-    NO_OF_FOL_SENTENCES = int(file[1+NO_OF_QUERIES].rstrip('\n'))
-    for fol_sentence in file[2+NO_OF_QUERIES:2+NO_OF_QUERIES+NO_OF_FOL_SENTENCES]:
-        fol_sentence = fol_sentence.rstrip()
-        fol_sentence = fol_sentence.replace(' ', '')
-        fol_sentence = fol_sentence.replace('\t', '')
-        FOL_SENTENCES.append(fol_sentence)
-    FOL_SENTENCES = list(set(FOL_SENTENCES))
-    return QUERIES, FOL_SENTENCES
-
-def prepare_knowledgebase(FOL_SENTENCES):
-    """
-    Takes a set of FOL statements and performs 
-    preprocessing for converting them to CNF form
-    adds the converted CNF statements to KNOWLEDGE_BASE and 
-    updates the KNOWLEDGE_BASE_HASH
-    """
-    global predicates_dict
-    for statement in FOL_SENTENCES:
-        predicates_dict.clear()
-        statement, predicates_dict = replace_predicate_by_constant(statement)
-        statement = convert_to_postfix(statement)
-        root = convert_postfix_to_tree(statement)               # convert to expression tree
-        remove_implication(root)                                # remove implication
-        propagate_negation(root)                                # propagate negation
-        distribute_and_over_or(root)                            # distribute AND over OR
-        inorder = inorder_traversal(root)
-        statement = replace_constant_by_predicate(inorder, predicates_dict)
-        statements = statement.split('&')
-        statements = standardize_variables(statements)
-        for cnf_stmt in statements:
-            stmt_obj = Statement(cnf_stmt)
-            stmt_obj.add_statement_to_KB(KNOWLEDGE_BASE, KNOWLEDGE_BASE_HASH)
-
-def display_knowledgebase(KB, KB_HASH=None):
-    """
-    takes Knowledge base and KNOWLEDGE_BASE_HASH as arguments
-    """
-    print "\nKNOWLEDGE_BASE\n"
-    for statement in KB:
-        print statement
-    print 'Total No. of Statements : ', len(KB)
-    if KB_HASH:
-        print "\nKNOWLEDGE_BASE_HASH\n"
-        for key, value in KB_HASH.iteritems():
-            print key, ':', len(value), ' Statements'
-    
-def FOL_Resolution(KB, KB_HASH, query):
-    """
-    Performs resolution of KB and query using Set of Set
-    approach where KB is one set and KB2 is the second set
-    query is the statement to be proved using resolution
-    Returns: True if a contradiction is found and hence query 
-    is proved to be True
-    else False if query cannot be proved from the Knowledge base
-    """
-    KB2 = set()
-    KB_HASH = {}
-    query.add_statement_to_KB(KB2, KB_HASH)
-    query.add_statement_to_KB(KB, KB_HASH)
-    while True:
-        history = {}        # maintains mapping of statements that have been resolved earlier
-        new_statements = set()
-        # stop resoltion if Knowledge base size grows more than KILL_LIMIT
-        if len(KB) > KILL_LIMIT: return False
-        for statement1 in KB:
-            # get possible set of statements with which the current statement cant be resolved
-            resolving_clauses = statement1.get_resolving_clauses(KB_HASH)
-            for statement2 in resolving_clauses:
-                if statement1 == statement2:
-                    continue        # avoids resolution of a statement with itself
-                flag1 = False
-                flag2 = False
-                if statement2.statement_string in history:
-                    flag1 = True
-                    if statement1.statement_string in history[statement2.statement_string]:
-                        history[statement2.statement_string].discard(statement1.statement_string)
-                        continue        # avoids resolving two statements that appear in history
-                if statement1.statement_string in history:
-                    flag2 = True
-                    if statement2.statement_string in history[statement1.statement_string]:
-                        history[statement1.statement_string].discard(statement2.statement_string)
-                        continue        # avoids resolving two statements that appear in history
-                # update history
-                if flag2:
-                    history[statement1.statement_string].add(statement2.statement_string)
-                else:
-                    history[statement1.statement_string] = set([statement2.statement_string])
-                resolvents = statement1.resolve(statement2)     # resolve statement1 with statement2
-                if resolvents == False:             #contradiction found, return True
-                    return True
-                new_statements = new_statements.union(resolvents)
-        if new_statements.issubset(KB):
-            return False    # returns False if no new Knowledge is infered
-        new_statements = new_statements.difference(KB)
-        # update Knowledge base 2 to contains newly infered statements only
-        KB2 = set()
-        KB_HASH = {}
-        for stmt in new_statements:
-            stmt.add_statement_to_KB(KB2, KB_HASH)
-        # add newly infered statements to Knowledge base 1 as well
-        # to allow resoltion between newly infered statements
-        KB = KB.union(new_statements)
-    
-def write_output(result):
-    """
-    writes output of a query to OUTPUT_FILE
-    """
-    output = TRUE + '\n' if result else FALSE + '\n'
-    with open(OUTPUT_FILE, 'a') as f_output:
-        f_output.write(output)
-    f_output.close()
-
-def factor_statements(statement_set):
-    """
-    removes duplicate predicates from a set 
-    of statements and returns factored statements    
-    """
-    for statement in statement_set:
-        new_predicate_set = set()
-        predicate_list = list(statement.predicate_set)
-        for index, predicate1 in enumerate(predicate_list):
-            for predicate2 in predicate_list[index+1:]:
-                if predicate1.negative == predicate2.negative:
-                    substitution = predicate1.unify_with_predicate(predicate2)
-                    if substitution == False:
-                        continue
-                    else:
-                        for pred in predicate_list:
-                            pred.substitute(substitution)
-        statement.init_from_predicate_set(set(predicate_list))
-    return statement_set
-
-QUERIES, FOL_SENTENCES = init_problem()
-prepare_knowledgebase(FOL_SENTENCES)
-# performs resolution for each query
-# negates the query, prepares a statement for the negated query, 
-# prepares a new copy of Knowledge base and Hash
-# Performs resoltion and writes result
-for query_predicate in QUERIES:
-    query_predicate.negate()
-    query_predicate = Statement(query_predicate.predicate_string)
-    KB = copy.deepcopy(KNOWLEDGE_BASE)
-    KB_HASH = copy.deepcopy(KNOWLEDGE_BASE_HASH)
-    satisfiability = FOL_Resolution(KB, KB_HASH, query_predicate)
-    write_output(satisfiability)
\ No newline at end of file
+from Predicate import *
+from Statement import *
+from Index import TermIndex, FeatureIndex
+from KnowledgeBase import KnowledgeBase
+from Strategy import make_strategy, PassiveQueue
+from Horn import HornProver
+from Relevance import RelevanceGraph
+from Materialize import Materialization
+from Hyper import HyperResolver, is_positive
+from ProofCache import ProofCache, knowledge_base_fingerprint, normalize_query
+from CompiledKB import write_compiled_knowledgebase, read_compiled_knowledgebase
+from Budget import Budget
+from ClauseStore import ClauseStore
+from Answers import Answers, query_variables, rename_query, answer_predicate, statement_answer
+import Signature
+import Trace
+import re
+import itertools
+import multiprocessing
+import hashlib
+import threading
+import json
+import time
+import cProfile
+UPPER_ALPHA_MAPPING = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z']
+LOWER_ALPHA_MAPPING = ['a','b','c','d','e','f','g','h','i','j','k','l','m','n','o','p','q','r','s','t','u','v','w','x','y','z']
+OPERATOR_PRIORITY = {'~':4, '&':3, '|':2, '=>':1}       #~: Not, &: And, |: Or, =>: Implication
+BINARY_OPERATORS = frozenset(['&', '|', '=>'])
+PREDICATE_PATTERN = r'[A-Z][A-Za-z]*\([A-Za-z]+(?:,[A-Za-z]+)*\)'      #a predicate string with its arguments
+TOKEN_PATTERN = re.compile(PREDICATE_PATTERN + r'|=>|[~&|()]')      #a predicate string or an operator or parenthesis
+QUERY_PATTERN = re.compile('~?' + PREDICATE_PATTERN + '$')      #a query, one predicate string that may be negated
+STANDARD_VARIABLE_COUNT = 0     #maintains a count of standardized variables 
+DEFINITION_COUNT = 0            #maintains a count of fresh predicates introduced by the definitional CNF conversion
+DEFINITION_PREFIX = '#Def'      #prefix of the fresh predicates, cannot clash with predicate names of the input, which begin with a letter
+TRUE = 'TRUE'
+FALSE = 'FALSE'
+UNKNOWN = 'UNKNOWN'
+INPUT_FILE = 'input.txt'
+OUTPUT_FILE = 'output.txt'
+CNF_MODE = 'distribute'         #'distribute' or 'definitional', definitional introduces fresh predicates so the CNF grows linearly
+COMPILED_KB_FILE = None         #compiled Knowledge base file (e.g. 'input.kb'), loaded instead of converting the FOL sentences when they are unchanged
+KILL_LIMIT = 8000               #stops the resolution inference (result unknown) when Knowledge base size exceeds KILL_LIMIT
+QUERY_TIME_LIMIT = None         #seconds of wall clock time a query may take before its result is unknown, None for no limit
+QUERY_MEMORY_LIMIT = None       #megabytes the process may grow by while proving a query before its result is unknown, None for no limit
+ITERATIVE_DEEPENING = False     #retries a query with longer resolvents allowed, see DEEPENING_LENGTHS
+DEEPENING_LENGTHS = [2, 4, 8]   #maximum number of predicates of a resolvent in the rounds before the unlimited round
+ANSWER_EXTRACTION = False       #writes the bindings of the variables of a query after TRUE, e.g. TRUE x=John;x=Tom
+MAX_ANSWERS = None              #stops a query with variables after this many answers, None finds every answer
+THREE_VALUED_OUTPUT = False     #writes UNKNOWN for a query stopped by a limit, otherwise FALSE is written
+RESOLUTION_ENGINE = 'given_clause'      #'given_clause', 'set_of_sets' or 'hyper', selects the resolution loop used per query
+SUBSUMPTION = True              #discards subsumed statements in the given_clause and hyper engines
+SIGNATURE_FILTER = False        #selects the resolving pairs of the set_of_sets engine in batches with NumPy signature matrices (ignored without NumPy)
+PASSIVE_LIMIT = None            #maximum number of passive statements of the given_clause engine, None for no limit
+RETENTION_POLICY = 'heaviest'   #'heaviest' or 'oldest', the passive statements evicted first when PASSIVE_LIMIT is reached
+RETENTION_ARCHIVE = True        #evicted statements are archived to a temporary file and picked later, otherwise they are discarded
+HORN_FAST_PATH = True           #proves queries by tabled backward chaining when every CNF statement is Horn
+MATERIALIZATION = False         #answers ground queries by lookup in the closure of the facts derivable from the definite statements
+MATERIALIZATION_LIMIT = 1000000 #facts at which the closure is abandoned and every query is proved by resolution
+RELEVANCE_SLICING = False       #resolves a query against the Knowledge base statements connected to it only, see RELEVANCE_DEPTHS
+RELEVANCE_DEPTHS = [1, 2, 4]    #depths of the slices tried in turn before the slice of every connected statement, a proof that fails widens the slice
+SEARCH_STRATEGY = 'sos'         #strategies of the given_clause engine joined by '+', from 'fifo', 'sos', 'unit', 'weight[:age ratio]'
+QUERY_WORKERS = 1               #number of worker processes proving queries in parallel, 1 proves them in this process
+SATURATION_WORKERS = 1          #number of worker processes sharing the resolutions of one given clause, 1 resolves in this process
+PARALLEL_MIN_CANDIDATES = 64    #given clauses with fewer resolving candidates are resolved in this process
+PROOF_CACHE_FILE = None         #sqlite file caching query results across runs (e.g. 'proof_cache.db'), None disables the cache
+PROOF_CACHE_SIZE = 100000       #maximum number of results kept in PROOF_CACHE_FILE, least recently used are evicted
+TRACE_FILE = None               #JSON lines file receiving the counters and timers of the preparation and of every query (e.g. 'trace.jsonl')
+PROFILE_FILE = None             #cProfile stats file of the proved queries (e.g. 'prover.prof'), query workers write PROFILE_FILE.<worker name>
+CNF_LOCK = threading.Lock()     #serializes CNF conversions of Provers, which share the variable and definition counts
+PROFILER = None                 #cProfile.Profile of the queries proved in this process, created on first use when PROFILE_FILE is set
+SATURATION_POOL = None          #process pool used when SATURATION_WORKERS is more than 1, created on first use
+KNOWLEDGE_BASE_HASH = TermIndex()
+KNOWLEDGE_BASE = KnowledgeBase()
+KNOWLEDGE_BASE_FEATURES = FeatureIndex()        #feature index of KNOWLEDGE_BASE used for subsumption
+HORN_PROVER = HornProver()      #index of the heads of KNOWLEDGE_BASE statements used when they are all Horn
+KNOWLEDGE_BASE_RELEVANCE = RelevanceGraph()     #predicate connection graph of KNOWLEDGE_BASE used by RELEVANCE_SLICING
+KNOWLEDGE_BASE_SIGNATURES = Signature.make_index(SIGNATURE_FILTER)     #SignatureIndex of KNOWLEDGE_BASE used by SIGNATURE_FILTER, None when off
+"""
+Structure of KNOWLEDGE_BASE_HASH:
+TermIndex({
+    ("Predicate_Name", negative, arity) : IndexEntry(
+        statements : set(statement_1, statement_2 ...) - that is set of statements objects
+        constants : [{"Constant" : set of statements}, ...] - one dict per argument position
+        variables : [set of statements, ...] - one set per argument position
+    )
+})
+
+Structure of KNOWLEDGE_BASE:
+KnowledgeBase(set([
+    Statement Object 1,
+    Statement Object 2,
+    ...
+]))
+
+Every query is proved against overlays of KNOWLEDGE_BASE, KNOWLEDGE_BASE_HASH
+and KNOWLEDGE_BASE_FEATURES, which hold the negated query and the infered 
+statements while sharing the prepared knowledge base read only.
+"""
+
+class Node(object):
+    """
+    An object of this class is used to hold one predicate
+    or operator of a statement, used to construct a statement tree
+    while parsing a statement and converting it to CNF.
+    Nodes are never modified once built, so the conversion steps
+    return new nodes and share the unchanged subtrees.
+    member variables include:
+    value : operator ('&', '|', '=>') or predicate string without negation
+    negation : True if the node is negated
+    left, right : operands of an operator, None for a predicate
+    """
+    __slots__ = ('value', 'negation', 'left', 'right')
+
+    def __init__(self, value, negation=False, left=None, right=None):
+        self.value = value
+        self.negation = negation
+        self.left = left
+        self.right = right
+
+    @property
+    def operator(self):
+        return self.left is not None
+
+    def negate(self):
+        return Node(self.value, not self.negation, self.left, self.right)
+
+def give_constant(count, uppercase):
+    """
+    count >= 0
+    uppercase : if True then constant begin from AA, else from aa
+    returns a string constant for count value
+    """
+    start = count + 26
+    str_constant = ''
+    while start >= 26:
+        val = start % 26
+        if uppercase:
+            str_constant = UPPER_ALPHA_MAPPING[val] + str_constant
+        else:
+            str_constant = LOWER_ALPHA_MAPPING[val] + str_constant
+        start //= 26
+    if uppercase:
+        str_constant = UPPER_ALPHA_MAPPING[start-1] + str_constant
+    else:
+        str_constant = LOWER_ALPHA_MAPPING[start-1] + str_constant
+    return str_constant
+
+def distribute_and_over_or(node, definitions=None):
+    """
+    distributes and over or in the step of converting an
+    FOL statement in negation normal form to CNF, returns the
+    CNF as a list of clauses, each a tuple of predicate strings
+    clauses of the operands are combined bottom up, which reaches
+    the fixpoint of rewriting A|(B&C) to (A|B)&(A|C) in one pass
+    if definitions is a list, an operand of an or with more than one
+    clause is replaced by a fresh predicate when the other operand
+    has more than one clause too, and the clauses defining the fresh
+    predicate are appended to definitions, so the number of clauses
+    grows linearly instead of multiplying
+    """
+    if not node.operator:
+        return [('~' + node.value if node.negation else node.value,)]
+    left = distribute_and_over_or(node.left, definitions)
+    right = distribute_and_over_or(node.right, definitions)
+    if node.value == '&':
+        return left + right
+    if definitions is not None and len(left) > 1 and len(right) > 1:
+        if len(left) > len(right):
+            left = define_clauses(left, definitions)
+        else:
+            right = define_clauses(right, definitions)
+    return [left_clause + right_clause for left_clause in left for right_clause in right]
+
+def define_clauses(clauses, definitions):
+    """
+    introduces a fresh predicate over the variables of clauses,
+    appends the clauses ~Fresh(variables)|clause to definitions
+    and returns the clauses of the fresh predicate alone
+    """
+    global DEFINITION_COUNT
+    variables = set()
+    for clause in clauses:
+        for predicate in clause:
+            variables.update(filter(lambda x: x.islower(), predicate[predicate.index('(')+1:-1].split(',')))
+    name = DEFINITION_PREFIX + give_constant(DEFINITION_COUNT, True)
+    DEFINITION_COUNT += 1
+    fresh = name + '(' + ','.join(sorted(variables) or [name]) + ')'
+    for clause in clauses:
+        definitions.append(('~' + fresh,) + clause)
+    return [(fresh,)]
+
+def propagate_negation(node, negate=False):
+    """
+    moves negation inside and hence applies De Morgans law,
+    returns the statement tree in negation normal form
+    """
+    negation = node.negation != negate
+    if not node.operator:
+        if negation == node.negation:
+            return node
+        return node.negate()
+    value = node.value
+    if negation:
+        if value == '&':
+            value = '|'
+        else:
+            value = '&'
+    left = propagate_negation(node.left, negation)
+    right = propagate_negation(node.right, negation)
+    if value == node.value and not node.negation and left is node.left and right is node.right:
+        return node
+    return Node(value, False, left, right)
+
+def remove_implication(node):
+    """
+    A=>B is equivalent to ~A|B
+    thus this method performs implication removal
+    """
+    if not node.operator:
+        return node
+    left = remove_implication(node.left)
+    right = remove_implication(node.right)
+    if node.value == '=>':
+        return Node('|', node.negation, left.negate(), right)
+    if left is node.left and right is node.right:
+        return node
+    return Node(node.value, node.negation, left, right)
+
+def tokenize(statement):
+    """
+    splits an FOL statement without whitespace into its tokens, the
+    operators, parentheses and predicate strings (with their arguments),
+    in one scan of the statement
+    """
+    tokens = []
+    position = 0
+    while position < len(statement):
+        match = TOKEN_PATTERN.match(statement, position)
+        if match is None:
+            raise ValueError('cannot parse %r at %r' % (statement, statement[position:]))
+        tokens.append(match.group())
+        position = match.end()
+    return tokens
+
+def parse_statement(statement):
+    """
+    parses an FOL statement without whitespace to its statement tree
+    by recursive descent over its tokens, where leaf nodes are predicate
+    nodes and internal nodes are operators, operators bind by
+    OPERATOR_PRIORITY and implications group to the left
+    """
+    tokens = tokenize(statement)
+    root, position = parse_operation(tokens, 0, 1)
+    if position != len(tokens):
+        raise ValueError('cannot parse %r at %r' % (statement, ''.join(tokens[position:])))
+    return root
+
+def parse_operation(tokens, position, priority):
+    """
+    parses the operations of tokens from position whose operators have
+    at least priority, returns the tree and the position after it
+    """
+    node, position = parse_operand(tokens, position)
+    while position < len(tokens) and tokens[position] in BINARY_OPERATORS and OPERATOR_PRIORITY[tokens[position]] >= priority:
+        operator = tokens[position]
+        operands = [node]
+        while position < len(tokens) and tokens[position] == operator:
+            operand, position = parse_operation(tokens, position + 1, OPERATOR_PRIORITY[operator] + 1)
+            operands.append(operand)
+            if operator == '=>':
+                break
+        node = balanced_tree(operator, operands)
+    return node, position
+
+def balanced_tree(operator, operands):
+    """
+    joins operands (in order) with an associative operator into a
+    balanced tree, so long conjunctions and disjunctions do not nest
+    deeper than the recursion of the conversion steps allows
+    """
+    if len(operands) == 1:
+        return operands[0]
+    middle = len(operands) // 2
+    return Node(operator, False, balanced_tree(operator, operands[:middle]), balanced_tree(operator, operands[middle:]))
+
+def parse_operand(tokens, position):
+    """
+    parses a predicate, a negation or a parenthesized
+    statement at position of tokens
+    """
+    if position == len(tokens):
+        raise ValueError('statement ends with an operator')
+    token = tokens[position]
+    if token == '~':
+        node, position = parse_operand(tokens, position + 1)
+        return node.negate(), position
+    if token == '(':
+        node, position = parse_operation(tokens, position + 1, 1)
+        if position == len(tokens) or tokens[position] != ')':
+            raise ValueError('missing closing parenthesis')
+        return node, position + 1
+    if token in BINARY_OPERATORS or token == ')':
+        raise ValueError('unexpected %r' % token)
+    return Node(token), position + 1
+
+def clause_to_statement(clause):
+    """
+    joins the predicate strings of a clause into a statement
+    string, returns None if the clause is a tautology
+    """
+    predicates = set(clause)
+    for predicate in predicates:
+        if '~' + predicate in predicates:
+            return None
+    return '|'.join(predicates)
+
+def standardize_variables(statements):
+    """
+    takes list of CNF statements strings as argument 
+    return them as list of standardized CNF statements,
+    standardizes the variables for all the statements
+    """
+    global STANDARD_VARIABLE_COUNT
+    standard_statements = []
+    for statement in statements:
+        variable_dict = {}
+        r = re.compile('\([a-zA-Z,]+\)')
+        parameters = r.findall(statement)
+        parameters = map(lambda x:x[1:-1], parameters)
+        parameters = ','.join(parameters)
+        parameters = parameters.split(',')
+        parameters = filter(lambda x: x.islower(), parameters)
+        parameters = list(set(parameters))
+        for para in parameters:
+            variable_dict[para] = give_constant(STANDARD_VARIABLE_COUNT, False)
+            STANDARD_VARIABLE_COUNT += 1
+        predicates = statement.split('|')
+        predicate_list = []
+        for predicate in predicates:
+            parts = predicate.split('(')
+            parameters = parts[1][:-1].split(',')
+            parameters = map(lambda x:variable_dict[x] if x in variable_dict else x, parameters)
+            predicate = parts[0] + '(' + ','.join(parameters) + ')'
+            predicate_list.append(predicate)
+        standard_statements.append('|'.join(predicate_list))
+    return standard_statements
+            
+
+def init_problem(input_file=None):
+    """
+    Parses the Query statements and the Knowledge base
+    statements from the input file (INPUT_FILE by default)
+    and returns them
+    """
+    QUERIES, FOL_SENTENCES = stream_problem(input_file)
+    return QUERIES, list(FOL_SENTENCES)
+
+def stream_problem(input_file=None):
+    """
+    Parses the Query statements from the input file (INPUT_FILE
+    by default) and returns them with an iterator over the Knowledge
+    base statements, which reads them from the file one line at a time
+    """
+    if input_file is None:
+        input_file = INPUT_FILE
+    f_input = open(input_file)
+    NO_OF_QUERIES = int(f_input.readline())
+    QUERIES = [parse_query(f_input.readline()) for _ in xrange(NO_OF_QUERIES)]
+    NO_OF_FOL_SENTENCES = int(f_input.readline())
+    return QUERIES, stream_sentences(f_input, NO_OF_FOL_SENTENCES)
+
+def parse_query(query):
+    """
+    returns the Predicate of a query string, raises ValueError if
+    it is not one predicate string such as Mother(Ann,x)
+    """
+    query = remove_whitespace(query)
+    if QUERY_PATTERN.match(query) is None:
+        raise ValueError('cannot parse query %r' % query)
+    return Predicate(query)
+
+def stream_sentences(f_input, count):
+    """
+    yields the next count FOL sentences of f_input without whitespace,
+    skipping repeated sentences, only a digest of every sentence read
+    is kept, then closes f_input
+    """
+    digests = set()
+    with f_input:
+        for line in itertools.islice(f_input, count):
+            fol_sentence = remove_whitespace(line)
+            digest = hashlib.sha1(fol_sentence).digest()
+            if digest not in digests:
+                digests.add(digest)
+                yield fol_sentence
+
+def remove_whitespace(line):
+    line = line.rstrip()
+    line = line.replace(' ', '')
+    line = line.replace('\t', '')
+    return line
+
+def prepare_knowledgebase(FOL_SENTENCES):
+    """
+    Takes a set of FOL statements and performs 
+    preprocessing for converting them to CNF form
+    adds the converted CNF statements to KNOWLEDGE_BASE and 
+    updates the KNOWLEDGE_BASE_HASH, FOL_SENTENCES may be an
+    iterator, returns the number of statements converted
+    """
+    count = 0
+    for statement in FOL_SENTENCES:
+        count += 1
+        for stmt_obj in convert_to_cnf(statement):
+            with Trace.phase('index'):
+                add_statement_to_knowledgebase(stmt_obj)
+    return count
+
+def convert_to_cnf(statement):
+    """
+    converts an FOL statement without whitespace to
+    a list of standardized CNF statement objects
+    """
+    with Trace.phase('parse'):
+        root = parse_statement(statement)                       # convert to expression tree
+    with Trace.phase('remove_implication'):
+        root = remove_implication(root)                         # remove implication
+    with Trace.phase('propagate_negation'):
+        root = propagate_negation(root)                         # propagate negation
+    with Trace.phase('distribute'):
+        definitions = [] if CNF_MODE == 'definitional' else None
+        clauses = distribute_and_over_or(root, definitions)     # distribute AND over OR
+        statements = map(clause_to_statement, clauses + (definitions or []))
+        statements = filter(None, statements)
+    with Trace.phase('standardize'):
+        statements = standardize_variables(statements)
+        return map(lambda x:Statement(x), statements)
+
+def add_statement_to_knowledgebase(stmt_obj):
+    """
+    adds a CNF statement to KNOWLEDGE_BASE and updates
+    KNOWLEDGE_BASE_HASH, KNOWLEDGE_BASE_FEATURES, HORN_PROVER,
+    KNOWLEDGE_BASE_RELEVANCE and KNOWLEDGE_BASE_SIGNATURES
+    """
+    add_statement(stmt_obj, KNOWLEDGE_BASE, KNOWLEDGE_BASE_HASH, KNOWLEDGE_BASE_FEATURES, HORN_PROVER, KNOWLEDGE_BASE_RELEVANCE, KNOWLEDGE_BASE_SIGNATURES)
+
+def remove_statement(stmt_obj, KB, KB_HASH, KB_FEATURES, horn_prover, relevance, signatures=None):
+    """
+    removes a CNF statement from KB, KB_HASH, KB_FEATURES, horn_prover,
+    relevance and signatures (unless None)
+    """
+    if stmt_obj in KB:
+        KB.discard(stmt_obj)
+        KB_HASH.remove(stmt_obj)
+        KB_FEATURES.remove(stmt_obj)
+        horn_prover.remove(stmt_obj)
+        relevance.remove(stmt_obj)
+        if signatures is not None:
+            signatures.remove(stmt_obj)
+
+def add_statement(stmt_obj, KB, KB_HASH, KB_FEATURES, horn_prover, relevance, signatures=None):
+    """
+    adds a CNF statement to KB unless it is already there and updates
+    KB_HASH, KB_FEATURES, horn_prover, relevance and signatures (unless None)
+    """
+    if stmt_obj not in KB:
+        stmt_obj.add_statement_to_KB(KB, KB_HASH)
+        KB_FEATURES.add(stmt_obj)
+        horn_prover.add(stmt_obj)
+        relevance.add(stmt_obj)
+        if signatures is not None:
+            signatures.add(stmt_obj)
+
+def load_knowledgebase(FOL_SENTENCES):
+    """
+    prepares the knowledge base of FOL_SENTENCES, when COMPILED_KB_FILE
+    is set the CNF statements are loaded from it if it was compiled from
+    the same sentences, otherwise they are prepared and compiled into it
+    FOL_SENTENCES may be an iterator, it is only read into a list to
+    compute the digest of a compiled Knowledge base, returns the number
+    of FOL sentences
+    """
+    global STANDARD_VARIABLE_COUNT
+    if not COMPILED_KB_FILE:
+        return prepare_knowledgebase(FOL_SENTENCES)
+    FOL_SENTENCES = list(FOL_SENTENCES)
+    source_digest = hashlib.sha1(CNF_MODE + '\n' + '\n'.join(sorted(FOL_SENTENCES))).digest()
+    compiled = read_compiled_knowledgebase(COMPILED_KB_FILE, source_digest)
+    if compiled is None:
+        prepare_knowledgebase(FOL_SENTENCES)
+        write_compiled_knowledgebase(COMPILED_KB_FILE, KNOWLEDGE_BASE, source_digest, STANDARD_VARIABLE_COUNT)
+    else:
+        statements, STANDARD_VARIABLE_COUNT = compiled
+        for stmt_obj in statements:
+            add_statement_to_knowledgebase(stmt_obj)
+    return len(FOL_SENTENCES)
+
+def display_knowledgebase(KB, KB_HASH=None):
+    """
+    takes Knowledge base and KNOWLEDGE_BASE_HASH as arguments
+    """
+    print "\nKNOWLEDGE_BASE\n"
+    for statement in KB:
+        print statement
+    print 'Total No. of Statements : ', len(KB)
+    if KB_HASH:
+        print "\nKNOWLEDGE_BASE_HASH\n"
+        for key, value in KB_HASH.buckets():
+            print '~'[not key[1]:] + key[0] + '/' + str(key[2]), ':', len(value), ' Statements'
+    
+def FOL_Resolution(KB, KB_HASH, query, budget=None, answers=None, signatures=None):
+    """
+    Performs resolution of KB and query using Set of Set
+    approach where KB is one set and KB2 is the second set
+    query is the statement to be proved using resolution
+    Returns: True if a contradiction is found and hence query 
+    is proved to be True
+    else False if query cannot be proved from the Knowledge base
+    or None if the Budget budget is exceeded first
+    answers (an Answers list) collects the answers of a query with an answer predicate
+    with SIGNATURE_FILTER the resolving pairs of each round are selected
+    by one SignatureIndex.resolving_pairs call instead of KB_HASH lookups,
+    signatures is an overlay of the SignatureIndex of KB (built here when
+    None), and only the statements having a pair are visited
+    """
+    if budget is None:
+        budget = make_budget()
+    KB2 = set()
+    KB_HASH = TermIndex()
+    query.add_statement_to_KB(KB2, KB_HASH)
+    query.add_statement_to_KB(KB, KB_HASH)
+    if not SIGNATURE_FILTER or not Signature.available():
+        signatures = None
+    elif signatures is None:
+        signatures = Signature.SignatureIndex(KB)
+    else:
+        signatures.add(query)
+    while True:
+        history = {}        # maintains mapping of statements that have been resolved earlier
+        new_statements = set()
+        # stop resoltion if Knowledge base size grows more than KILL_LIMIT, or out of time or memory
+        if budget.exceeded(len(KB)): return None
+        if Trace.TRACE is not None:
+            Trace.TRACE.append('kb_size', len(KB))
+        if signatures is not None:
+            candidates = signatures.resolving_pairs(list(KB2)).iteritems()
+        else:
+            candidates = ((statement1, None) for statement1 in KB)
+        for statement1, resolving_clauses in candidates:
+            if budget.exceeded(): return None
+            # get possible set of statements with which the current statement cant be resolved
+            if resolving_clauses is None:
+                resolving_clauses = statement1.get_resolving_clauses(KB_HASH)
+            elif Trace.TRACE is not None:
+                Trace.TRACE.observe('resolving_candidates', len(resolving_clauses))
+            for statement2 in resolving_clauses:
+                if statement1 == statement2:
+                    continue        # avoids resolution of a statement with itself
+                flag1 = False
+                flag2 = False
+                if statement2.statement_string in history:
+                    flag1 = True
+                    if statement1.statement_string in history[statement2.statement_string]:
+                        history[statement2.statement_string].discard(statement1.statement_string)
+                        continue        # avoids resolving two statements that appear in history
+                if statement1.statement_string in history:
+                    flag2 = True
+                    if statement2.statement_string in history[statement1.statement_string]:
+                        history[statement1.statement_string].discard(statement2.statement_string)
+                        continue        # avoids resolving two statements that appear in history
+                # update history
+                if flag2:
+                    history[statement1.statement_string].add(statement2.statement_string)
+                else:
+                    history[statement1.statement_string] = set([statement2.statement_string])
+                resolvents = statement1.resolve(statement2)     # resolve statement1 with statement2
+                if resolvents == False:             #contradiction found, return True
+                    return True
+                new_statements = new_statements.union(resolvents)
+        new_statements = set(stmt for stmt in new_statements if stmt not in KB and budget.allows(stmt))
+        if answers is not None:
+            answer_statements = set(stmt for stmt in new_statements if statement_answer(stmt) is not None)
+            for stmt in answer_statements:
+                if add_answer(answers, statement_answer(stmt)):
+                    return True
+            new_statements -= answer_statements
+        if not new_statements:
+            return bool(answers)    # returns False if no new Knowledge is infered
+        # update Knowledge base 2 to contains newly infered statements only
+        KB2 = set()
+        KB_HASH = TermIndex()
+        for stmt in new_statements:
+            stmt.add_statement_to_KB(KB2, KB_HASH)
+            if signatures is not None:
+                signatures.add(stmt)
+        # add newly infered statements to Knowledge base 1 as well
+        # to allow resoltion between newly infered statements
+        KB.update(new_statements)
+    
+def given_clause_resolution(KB, KB_HASH, query, KB_FEATURES=None, strategy=None, budget=None, answers=None):
+    """
+    Performs resolution of KB and query using the given clause
+    approach, the query starts the passive set and, with a set of
+    support strategy, KB and KB_HASH form the active set (otherwise 
+    the KB statements are queued in the passive set as well). One clause
+    at a time (the given clause) is taken from the passive set in the
+    order of the search strategy (SEARCH_STRATEGY when not given),
+    resolved against the active set and then moved into it, so each
+    pair of clauses is resolved once.
+    Newly infered statements are queued in the passive set unless an
+    existing statement subsumes them, and they retire the existing
+    statements they subsume (when SUBSUMPTION is enabled), KB_FEATURES
+    is the feature index of KB, built here when not given.
+    The passive set is kept within PASSIVE_LIMIT statements by a
+    ClauseStore, see RETENTION_POLICY and RETENTION_ARCHIVE.
+    answers (an Answers list) collects the answers of a query with an
+    answer predicate, resolvents that are answers are not resolved further
+    Returns: True if a contradiction is found and hence query 
+    is proved to be True
+    else False if query cannot be proved from the Knowledge base
+    or None if the Budget budget (KILL_LIMIT by default) is exceeded first
+    """
+    if budget is None:
+        budget = make_budget()
+    if strategy is None:
+        strategy = make_strategy(SEARCH_STRATEGY)
+    features = None                 # feature index over active and passive statements
+    if SUBSUMPTION:
+        features = KB_FEATURES
+        if features is None:
+            features = FeatureIndex()
+            for statement in KB:
+                features.add(statement)
+        features.add(query)
+    passive = PassiveQueue(strategy)
+    passive.push(query)
+    if not strategy.set_of_support:
+        for statement in KB:
+            passive.push(statement)
+        KB = KnowledgeBase()            # active set starts empty
+        KB_HASH = TermIndex()
+    store = ClauseStore(passive, features, PASSIVE_LIMIT, RETENTION_POLICY, RETENTION_ARCHIVE)
+    try:
+        return saturate(KB, KB_HASH, passive, features, store, budget, answers)
+    finally:
+        store.close()
+
+def saturate(KB, KB_HASH, passive, features, store, budget, answers):
+    """
+    main loop of given_clause_resolution, returns its result
+    """
+    while passive or store.restore(KB):
+        # stop resoltion if active and passive sets grow more than KILL_LIMIT, or out of time or memory
+        if budget.exceeded(len(KB) + len(passive)): return None
+        given = passive.pop()
+        if given is None or given in KB:
+            continue        # given clause has already been resolved with the active set
+        if Trace.TRACE is not None:
+            Trace.TRACE.count('given_clauses')
+        # avoids resolution of a statement with itself
+        candidates = [statement for statement in given.get_resolving_clauses(KB_HASH) if statement != given]
+        for resolvents in resolve_candidates(given, candidates):
+            if resolvents == False:             #contradiction found, return True
+                return True
+            for resolvent in resolvents:
+                if answers is not None and statement_answer(resolvent) is not None:
+                    if add_answer(answers, statement_answer(resolvent)):
+                        return True
+                    continue
+                if resolvent in KB or resolvent in passive or not budget.allows(resolvent):
+                    continue
+                if features is not None:
+                    if forward_subsumed(resolvent, features):
+                        if Trace.TRACE is not None:
+                            Trace.TRACE.count('forward_subsumed')
+                        continue
+                    backward_subsume(resolvent, features, KB, KB_HASH, passive)
+                    features.add(resolvent)
+                passive.push(resolvent)
+        store.retain()
+        if features is None or given in features:      # given clause may have been subsumed by its resolvents
+            given.add_statement_to_KB(KB, KB_HASH)
+    if answers:
+        return True
+    if store.discarded:
+        return None     # statements were discarded, the query may still follow
+    return False    # returns False if no new Knowledge can be infered
+
+def hyper_resolution(KB, KB_HASH, query, budget=None, answers=None):
+    """
+    Performs positive hyperresolution of KB and query, the statements
+    having negative predicates are nuclei, indexed by KB_HASH, and the
+    positive statements are satellites. Like the given clause engine,
+    one satellite at a time is taken from the passive set (in the order
+    of SEARCH_STRATEGY, whose set of support is ignored), moved into the
+    active satellites and used in every hyperresolution with the active
+    satellites (see HyperResolver). The input satellites, hyperresolvents
+    and their factors are positive, they are queued in the passive set
+    unless a statement subsumes them and retire the statements they
+    subsume (when SUBSUMPTION is enabled). The feature index holds the
+    satellites only, so no KB_FEATURES of the nuclei is taken.
+    answers (an Answers list) collects the answers of a query with an answer predicate
+    Returns: True if a contradiction is found and hence query 
+    is proved to be True
+    else False if query cannot be proved from the Knowledge base
+    or None if the Budget budget (KILL_LIMIT by default) is exceeded first
+    """
+    if budget is None:
+        budget = make_budget()
+    query.add_statement_to_KB(KB, KB_HASH)
+    passive = PassiveQueue(make_strategy(SEARCH_STRATEGY))
+    features = None                 # feature index over active and passive satellites
+    if SUBSUMPTION:
+        features = FeatureIndex()
+    satellites = KnowledgeBase()
+    satellites_hash = TermIndex()
+    inputs = [statement for statement in KB if is_positive(statement)]
+    for statement in inputs:
+        passive.push(statement)
+        if features is not None:
+            features.add(statement)
+    for factor in factor_statements(inputs):
+        if factor not in passive:
+            queue_satellite(factor, satellites, satellites_hash, passive, features)
+    resolver = HyperResolver(KB_HASH, satellites_hash)
+    store = ClauseStore(passive, features, PASSIVE_LIMIT, RETENTION_POLICY, RETENTION_ARCHIVE)
+    try:
+        while passive or store.restore(satellites):
+            if budget.exceeded(len(satellites) + len(passive)): return None
+            given = passive.pop()
+            if given is None or given in satellites:
+                continue
+            if Trace.TRACE is not None:
+                Trace.TRACE.count('given_clauses')
+            given.add_statement_to_KB(satellites, satellites_hash)
+            hyperresolvents = list(resolver.resolvents(given))     # resolved before subsumption changes the satellites
+            if any(hyperresolvent is False for hyperresolvent in hyperresolvents):         #contradiction found, return True
+                return True
+            for hyperresolvent in hyperresolvents:
+                for resolvent in set([hyperresolvent]) | factor_statements([hyperresolvent]):
+                    if answers is not None and statement_answer(resolvent) is not None:
+                        if add_answer(answers, statement_answer(resolvent)):
+                            return True
+                        continue
+                    if resolvent in satellites or resolvent in passive or not budget.allows(resolvent):
+                        continue
+                    queue_satellite(resolvent, satellites, satellites_hash, passive, features)
+            store.retain()
+    finally:
+        store.close()
+    if answers:
+        return True
+    if store.discarded:
+        return None     # statements were discarded, the query may still follow
+    return False    # returns False if no new Knowledge can be infered
+
+def queue_satellite(statement, satellites, satellites_hash, passive, features):
+    """
+    queues the positive statement in the passive set of hyper_resolution
+    unless a statement of features subsumes it, the statements it
+    subsumes are retired, features is None when SUBSUMPTION is disabled
+    """
+    if features is not None:
+        if forward_subsumed(statement, features):
+            if Trace.TRACE is not None:
+                Trace.TRACE.count('forward_subsumed')
+            return
+        backward_subsume(statement, features, satellites, satellites_hash, passive)
+        features.add(statement)
+    passive.push(statement)
+
+def add_answer(answers, values):
+    """
+    adds the answer values to answers, returns True once MAX_ANSWERS are found
+    """
+    answers.add(values)
+    return MAX_ANSWERS is not None and len(answers) >= MAX_ANSWERS
+
+def resolve_candidates(given, candidates):
+    """
+    resolves given with every candidate statement and yields the
+    results of Statement.resolve in candidate order, large candidate
+    lists are split into contiguous shards resolved by the saturation
+    pool and merged back in shard order, so the given clause engine
+    sees exactly the results of the serial loop
+    """
+    pool = get_saturation_pool()
+    if pool is None or len(candidates) < PARALLEL_MIN_CANDIDATES:
+        for statement in candidates:
+            yield given.resolve(statement)
+        return
+    shard_size = (len(candidates) + 2 * SATURATION_WORKERS - 1) // (2 * SATURATION_WORKERS)
+    shards = [(given, candidates[index:index+shard_size]) for index in xrange(0, len(candidates), shard_size)]
+    for shard_results in pool.map(resolve_shard, shards):
+        for resolvents in shard_results:
+            yield resolvents
+
+def resolve_shard(shard):
+    """
+    runs in a saturation worker, resolves the given clause of shard with
+    each of its statements and returns the results in statement order
+    """
+    given, statements = shard
+    return [given.resolve(statement) for statement in statements]
+
+def get_saturation_pool():
+    """
+    returns the saturation pool, or None if resolutions are done in this
+    process (query workers are daemonic and cannot start processes)
+    """
+    global SATURATION_POOL
+    if SATURATION_WORKERS <= 1 or multiprocessing.current_process().daemon:
+        return None
+    if SATURATION_POOL is None:
+        SATURATION_POOL = multiprocessing.Pool(SATURATION_WORKERS)
+    return SATURATION_POOL
+
+def forward_subsumed(statement, features):
+    """
+    returns True if a statement of the feature index subsumes statement
+    """
+    for candidate in features.get_subsuming_candidates(statement):
+        if candidate.subsumes(statement):
+            return True
+    return False
+
+def backward_subsume(statement, features, KB, KB_HASH, passive):
+    """
+    retires the statements of the feature index subsumed by statement
+    from the active set (KB and KB_HASH) or the passive set
+    """
+    for candidate in features.get_subsumed_candidates(statement):
+        if statement.subsumes(candidate):
+            if Trace.TRACE is not None:
+                Trace.TRACE.count('backward_subsumed')
+            features.remove(candidate)
+            if candidate in passive:
+                passive.discard(candidate)
+            elif candidate in KB:
+                KB.discard(candidate)
+                KB_HASH.remove(candidate)
+
+RESOLUTION_ENGINES = {
+    'set_of_sets' : FOL_Resolution,
+    'given_clause' : given_clause_resolution,
+    'hyper' : hyper_resolution
+}
+
+def output_line(result):
+    """
+    returns the output line of the result of a query, without newline
+    """
+    if result is None:
+        return UNKNOWN if THREE_VALUED_OUTPUT else FALSE
+    if isinstance(result, Answers):
+        return TRUE + ' ' + str(result)
+    return TRUE if result else FALSE
+
+def write_output(result):
+    """
+    writes output of a query to OUTPUT_FILE
+    """
+    with open(OUTPUT_FILE, 'a') as f_output:
+        f_output.write(output_line(result) + '\n')
+    f_output.close()
+
+def factor_statements(statement_set):
+    """
+    removes duplicate predicates from a set 
+    of statements and returns factored statements    
+    """
+    factored_statements = set()
+    for statement in statement_set:
+        predicate_list = list(statement.predicate_set)
+        for index in xrange(len(predicate_list)):
+            for index2 in xrange(index+1, len(predicate_list)):
+                predicate1 = predicate_list[index]
+                predicate2 = predicate_list[index2]
+                if predicate1.negative == predicate2.negative:
+                    substitution = predicate1.unify_with_predicate(predicate2)
+                    if substitution is False:
+                        continue
+                    predicate_list = [pred.substitute(substitution) for pred in predicate_list]
+        factored_statements.add(Statement(predicate_set=predicate_list))
+    return factored_statements
+
+def prove_query(query_predicate):
+    """
+    proves query_predicate against the prepared Knowledge base,
+    returns True if the query is proved
+    """
+    return prove_against(query_predicate, KNOWLEDGE_BASE, KNOWLEDGE_BASE_HASH, KNOWLEDGE_BASE_FEATURES, HORN_PROVER, KNOWLEDGE_BASE_RELEVANCE, KNOWLEDGE_BASE_SIGNATURES)
+
+def prove_against(query_predicate, KB, KB_HASH, KB_FEATURES, horn_prover, relevance, signatures=None):
+    """
+    negates query_predicate, prepares a statement for the negated query
+    and overlays of the Knowledge base, Hash, feature index and signatures, then
+    performs resolution, returns True if the query is proved, False if
+    it is not and None if the limits were reached first (unknown)
+    Horn knowledge bases are handed to horn_prover instead
+    with RELEVANCE_SLICING, resolution is run on the slices of the
+    Knowledge base found by relevance (see prove_slices)
+    with ANSWER_EXTRACTION, a query with variables returns its Answers
+    when it has any, found in one run with an answer predicate
+    """
+    variables = query_variables(query_predicate)
+    deadline = time.time() + QUERY_TIME_LIMIT if QUERY_TIME_LIMIT else None
+    budget = make_budget(deadline)      # of materialization and the Horn prover
+    if MATERIALIZATION and not variables and not query_predicate.negative:
+        result = materialized_result(query_predicate, horn_prover, budget)
+        if result is not None:
+            return result
+    answers = None
+    query = rename_query(query_predicate)       # query variables apart from Knowledge base variables
+    query_predicate = [query.negate()]
+    if ANSWER_EXTRACTION and variables:
+        answers = Answers(variables)
+        query_predicate.append(answer_predicate(query_variables(query)))
+    query_predicate = Statement(predicate_set=query_predicate)
+    if HORN_FAST_PATH and horn_prover.horn:
+        if answers is None:
+            return horn_prover.prove(query_predicate, budget)
+        if not query.negative:
+            result = horn_prover.answers(query, answers, MAX_ANSWERS, budget)
+            return answers or result
+    if RELEVANCE_SLICING:
+        result = prove_slices(query_predicate, KB, KB_HASH, KB_FEATURES, relevance, deadline, answers, signatures)
+    else:
+        result = deepen(query_predicate, KB, KB_HASH, KB_FEATURES, deadline, answers, signatures)[0]
+    return answers or result
+
+def materialized_result(query_predicate, horn_prover, budget=None):
+    """
+    returns the result of a positive ground query found in the
+    materialization of horn_prover, made on first use within budget, or
+    None if the query must be proved: it is not a derived fact and either
+    the Knowledge base has non Horn statements, which may derive it, or its
+    goal statements contradict the facts, or the budget was exceeded first
+    """
+    materialization = materialize(horn_prover, budget)
+    if not materialization.complete:
+        return None
+    if materialization.holds(query_predicate):
+        if Trace.TRACE is not None:
+            Trace.TRACE.count('materialized_hits')
+        return True
+    if horn_prover.horn and not materialization.inconsistent:
+        if Trace.TRACE is not None:
+            Trace.TRACE.count('materialized_hits')
+        return False
+    return None
+
+def materialize(horn_prover, budget=None):
+    """
+    returns the Materialization of the definite statements of horn_prover,
+    one stopped by the Budget budget is not kept, so a later query makes it again
+    """
+    if horn_prover.materialization is not None:
+        return horn_prover.materialization
+    with Trace.phase('materialize'):
+        materialization = Materialization(horn_prover.rules, horn_prover.goals, MATERIALIZATION_LIMIT, budget)
+    if not materialization.stopped:
+        horn_prover.materialization = materialization
+    return materialization
+
+def deepen(query_predicate, KB, KB_HASH, KB_FEATURES, deadline, answers, signatures=None):
+    """
+    performs resolution of the negated query statement query_predicate
+    against overlays of KB, KB_HASH, KB_FEATURES and signatures (built by
+    the engine when None), returns the result and the Budget of the last run
+    with ITERATIVE_DEEPENING, resolution is first run with resolvents
+    limited to each length of DEEPENING_LENGTHS, a round that drops no
+    resolvent gives the final result, as does running out of time or memory
+    or a proof, a query with answers is deepened until MAX_ANSWERS are found
+    """
+    length_limits = [None]
+    if ITERATIVE_DEEPENING:
+        length_limits = DEEPENING_LENGTHS + length_limits
+    for length_limit in length_limits:
+        budget = make_budget(deadline, length_limit)
+        if RESOLUTION_ENGINE == 'given_clause':
+            features = KB_FEATURES.overlay() if KB_FEATURES is not None else None
+            result = given_clause_resolution(KB.overlay(), KB_HASH.overlay(), query_predicate, features, budget=budget, answers=answers)
+        elif RESOLUTION_ENGINE == 'set_of_sets' and signatures is not None:
+            result = FOL_Resolution(KB.overlay(), KB_HASH.overlay(), query_predicate, budget=budget, answers=answers, signatures=signatures.overlay())
+        else:
+            result = RESOLUTION_ENGINES[RESOLUTION_ENGINE](KB.overlay(), KB_HASH.overlay(), query_predicate, budget=budget, answers=answers)
+        if result and (answers is None or MAX_ANSWERS is not None and len(answers) >= MAX_ANSWERS):
+            break
+        if not budget.truncated or budget.exhausted in ('time', 'memory'):
+            break
+    return result, budget
+
+def prove_slices(query_predicate, KB, KB_HASH, KB_FEATURES, relevance, deadline, answers, signatures=None):
+    """
+    performs resolution of the negated query statement query_predicate
+    against the slices of KB relevant to it, of each depth of
+    RELEVANCE_DEPTHS and then of unlimited depth, a failed proof on a
+    slice that is not complete is retried on the next wider slice, as
+    is a query with answers until MAX_ANSWERS are found, returns the result
+    a slice holding every statement of KB is resolved against KB itself
+    """
+    for depth in RELEVANCE_DEPTHS + [None]:
+        statements, complete = relevance.relevant(query_predicate, depth)
+        if Trace.TRACE is not None:
+            Trace.TRACE.append('slice_size', len(statements))
+        if len(statements) == len(KB):
+            result, budget = deepen(query_predicate, KB, KB_HASH, KB_FEATURES, deadline, answers, signatures)
+            break
+        slice_KB = KnowledgeBase()
+        slice_KB_HASH = TermIndex()
+        for stmt_obj in statements:
+            stmt_obj.add_statement_to_KB(slice_KB, slice_KB_HASH)
+        result, budget = deepen(query_predicate, slice_KB, slice_KB_HASH, None, deadline, answers)
+        if complete or budget.exhausted is not None:
+            break
+        if result and (answers is None or MAX_ANSWERS is not None and len(answers) >= MAX_ANSWERS):
+            break
+    return result
+
+def make_budget(deadline=None, length_limit=None):
+    """
+    returns the Budget of a proof from KILL_LIMIT and QUERY_MEMORY_LIMIT
+    """
+    memory_limit = None
+    if QUERY_MEMORY_LIMIT:
+        memory_limit = QUERY_MEMORY_LIMIT * 1024 * 1024
+    return Budget(deadline, memory_limit, KILL_LIMIT, length_limit)
+
+class Prover(object):
+    """
+    a Knowledge base prepared once and kept in memory, for
+    programs that import Resolution and for Server.py
+        prover = Prover(['(Mother(x,y) => Parent(x,y))', 'Mother(Ann,Bob)'])
+        prover.prove('Parent(Ann,Bob)')         # True
+        prover.retract('Mother(Ann,Bob)')
+        prover.prove('Parent(Ann,Bob)')         # False
+    every Prover has its own Knowledge base, Hash, feature index, relevance graph,
+    signatures and HornProver, sentences are told and retracted in place and only the
+    told or retracted sentence is converted to CNF
+    results of queries are remembered until a told or retracted
+    statement shares a predicate, directly or through other statements,
+    with the query (for a consistent Knowledge base no other statement
+    can change the result), calls from several threads are serialized
+    member variables include:
+    sentences : maps a told FOL sentence to [times told, its CNF statements]
+    statement_counts : maps a statement to the number of told sentences having it
+    results : maps a predicate name to {normalized query : result}
+    """
+    def __init__(self, FOL_SENTENCES=()):
+        self.knowledge_base = KnowledgeBase()
+        self.knowledge_base_hash = TermIndex()
+        self.knowledge_base_features = FeatureIndex()
+        self.horn_prover = HornProver()
+        self.relevance = RelevanceGraph()
+        self.signatures = Signature.make_index(SIGNATURE_FILTER)
+        self.sentences = {}
+        self.statement_counts = {}
+        self.results = {}
+        self.lock = threading.RLock()
+        for fol_sentence in FOL_SENTENCES:
+            self.tell(fol_sentence)
+
+    @classmethod
+    def from_file(cls, input_file):
+        """
+        returns a Prover of the Knowledge base of an input file,
+        the queries of the file are ignored
+        """
+        return cls(init_problem(input_file)[1])
+
+    def tell(self, fol_sentence):
+        """
+        converts an FOL sentence to CNF and adds its statements
+        """
+        fol_sentence = remove_whitespace(str(fol_sentence))
+        with self.lock:
+            if fol_sentence in self.sentences:
+                self.sentences[fol_sentence][0] += 1
+                return
+            with CNF_LOCK:
+                statements = convert_to_cnf(fol_sentence)
+            self.sentences[fol_sentence] = [1, statements]
+            horn = self.horn_prover.horn
+            added = []
+            for stmt_obj in statements:
+                count = self.statement_counts.get(stmt_obj, 0)
+                self.statement_counts[stmt_obj] = count + 1
+                if count == 0:
+                    add_statement(stmt_obj, self.knowledge_base, self.knowledge_base_hash, self.knowledge_base_features, self.horn_prover, self.relevance, self.signatures)
+                    added.append(stmt_obj)
+            self.forget_results(added, horn != self.horn_prover.horn)
+
+    def retract(self, fol_sentence):
+        """
+        removes the statements of an FOL sentence told before, statements
+        of other told sentences stay, returns False if it was not told
+        """
+        fol_sentence = remove_whitespace(str(fol_sentence))
+        with self.lock:
+            if fol_sentence not in self.sentences:
+                return False
+            told = self.sentences[fol_sentence]
+            told[0] -= 1
+            if told[0]:
+                return True
+            del self.sentences[fol_sentence]
+            horn = self.horn_prover.horn
+            removed = []
+            for stmt_obj in told[1]:
+                self.statement_counts[stmt_obj] -= 1
+                if self.statement_counts[stmt_obj] == 0:
+                    del self.statement_counts[stmt_obj]
+                    remove_statement(stmt_obj, self.knowledge_base, self.knowledge_base_hash, self.knowledge_base_features, self.horn_prover, self.relevance, self.signatures)
+                    removed.append(stmt_obj)
+            self.forget_results(removed, horn != self.horn_prover.horn)
+            return True
+
+    def forget_results(self, statements, forget_all=False):
+        """
+        forgets the results of queries whose predicate is connected to
+        a predicate of statements by the statements of the Knowledge base
+        """
+        if forget_all:
+            self.results.clear()
+            return
+        if not self.results or not statements:
+            return
+        names = set()
+        for stmt_obj in statements:
+            names.update(predicate.name for predicate in stmt_obj.predicate_set)
+        frontier = list(names)
+        while frontier:
+            for stmt_obj in self.knowledge_base_hash.get_statements_with_name(frontier.pop()):
+                for predicate in stmt_obj.predicate_set:
+                    if predicate.name not in names:
+                        names.add(predicate.name)
+                        frontier.append(predicate.name)
+        for name in names:
+            self.results.pop(name, None)
+
+    def prove(self, query):
+        """
+        query is a Predicate or a predicate string such as 'Mother(Ann,x)',
+        returns True if it is infered from the Knowledge base, None if unknown,
+        raises ValueError if the predicate string cannot be parsed
+        """
+        if not isinstance(query, Predicate):
+            query = parse_query(str(query))
+        key = normalize_query(query)
+        with self.lock:
+            results = self.results.setdefault(query.name, {})
+            if key in results:
+                return results[key]
+            result = prove_against(query, self.knowledge_base, self.knowledge_base_hash, self.knowledge_base_features, self.horn_prover, self.relevance, self.signatures)
+            if result is not None:
+                results[key] = result       # unknown results may be proved with a larger budget
+            return result
+
+def init_query_worker(knowledge_base, knowledge_base_hash, knowledge_base_features, horn_prover, knowledge_base_relevance, knowledge_base_signatures):
+    """
+    initializer of a query worker process, receives the
+    prepared knowledge base once per worker
+    """
+    global KNOWLEDGE_BASE, KNOWLEDGE_BASE_HASH, KNOWLEDGE_BASE_FEATURES, HORN_PROVER, KNOWLEDGE_BASE_RELEVANCE, KNOWLEDGE_BASE_SIGNATURES
+    KNOWLEDGE_BASE = knowledge_base
+    KNOWLEDGE_BASE_HASH = knowledge_base_hash
+    KNOWLEDGE_BASE_FEATURES = knowledge_base_features
+    HORN_PROVER = horn_prover
+    KNOWLEDGE_BASE_RELEVANCE = knowledge_base_relevance
+    KNOWLEDGE_BASE_SIGNATURES = knowledge_base_signatures
+
+def prove_queries(queries):
+    """
+    proves every query against the prepared knowledge base and
+    yields the results in query order, results found in the proof
+    cache (PROOF_CACHE_FILE) are not proved again, the other queries
+    are spread over a pool of QUERY_WORKERS processes when more than
+    one is configured
+    """
+    cache = None
+    cached_results = [None] * len(queries)
+    if PROOF_CACHE_FILE:
+        cache = ProofCache(PROOF_CACHE_FILE, PROOF_CACHE_SIZE)
+        fingerprint = knowledge_base_fingerprint(KNOWLEDGE_BASE, prover_settings())
+        cached_results = [cache.get(fingerprint, query_predicate) for query_predicate in queries]
+    try:
+        results = prove_uncached_queries([query_predicate for query_predicate, result in zip(queries, cached_results) if result is None])
+        for query_predicate, satisfiability in zip(queries, cached_results):
+            if satisfiability is None:
+                satisfiability = next(results)
+                if cache is not None and satisfiability is not None and not isinstance(satisfiability, Answers):
+                    cache.put(fingerprint, query_predicate, satisfiability)
+            yield satisfiability
+    finally:
+        if cache is not None:
+            print 'Proof cache :', cache.hits, 'hits,', cache.misses, 'misses'
+            cache.close()
+
+def prove_uncached_queries(queries):
+    """
+    proves queries and yields the results in query order, in a pool of
+    QUERY_WORKERS processes when more than one worker is configured,
+    the trace of every query is written to TRACE_FILE when it is set,
+    with MATERIALIZATION the closure of the facts is made here, once
+    for every worker
+    """
+    if MATERIALIZATION and queries:
+        materialize(HORN_PROVER)
+    if TRACE_FILE or PROFILE_FILE:
+        for satisfiability, trace in map_queries(trace_query, queries):
+            if TRACE_FILE:
+                write_trace(trace)
+            yield satisfiability
+    else:
+        for satisfiability in map_queries(prove_query, queries):
+            yield satisfiability
+
+def map_queries(function, queries):
+    """
+    yields function of each query in query order, in a pool of
+    QUERY_WORKERS processes when more than one worker is configured
+    """
+    if QUERY_WORKERS <= 1 or len(queries) <= 1:
+        for query_predicate in queries:
+            yield function(query_predicate)
+        return
+    pool = multiprocessing.Pool(min(QUERY_WORKERS, len(queries)), init_query_worker,
+        (KNOWLEDGE_BASE, KNOWLEDGE_BASE_HASH, KNOWLEDGE_BASE_FEATURES, HORN_PROVER, KNOWLEDGE_BASE_RELEVANCE, KNOWLEDGE_BASE_SIGNATURES))
+    try:
+        for result in pool.imap(function, queries):
+            yield result
+    finally:
+        pool.terminate()
+        pool.join()
+
+def trace_query(query_predicate):
+    """
+    proves query_predicate while collecting its trace, and its
+    profile when PROFILE_FILE is set, returns (result, trace dict)
+    """
+    global PROFILER
+    if PROFILE_FILE and PROFILER is None:
+        PROFILER = cProfile.Profile()
+    trace = Trace.start()
+    start = time.time()
+    try:
+        if PROFILER is not None:
+            PROFILER.enable()
+        satisfiability = prove_query(query_predicate)
+    finally:
+        if PROFILER is not None:
+            PROFILER.disable()
+        Trace.stop()
+    record = {'query' : str(query_predicate), 'result' : satisfiability, 'seconds' : time.time() - start}
+    record.update(trace.to_dict())
+    if PROFILER is not None:
+        process_name = multiprocessing.current_process().name
+        PROFILER.dump_stats(PROFILE_FILE if process_name == 'MainProcess' else PROFILE_FILE + '.' + process_name)
+    return satisfiability, record
+
+def write_trace(record):
+    """
+    appends a trace record to TRACE_FILE as one JSON line
+    """
+    with open(TRACE_FILE, 'a') as f_trace:
+        f_trace.write(json.dumps(record, sort_keys=True) + '\n')
+
+def prover_settings():
+    """
+    returns the settings that can change the result of a query,
+    part of the proof cache key
+    """
+    return repr((KILL_LIMIT, RESOLUTION_ENGINE, SUBSUMPTION, SEARCH_STRATEGY, HORN_FAST_PATH, ANSWER_EXTRACTION, RELEVANCE_SLICING, MATERIALIZATION))
+
+if __name__ == '__main__':
+    QUERIES, FOL_SENTENCES = stream_problem()
+    if TRACE_FILE:
+        trace = Trace.start()
+        start = time.time()
+        count = load_knowledgebase(FOL_SENTENCES)
+        Trace.stop()
+        record = {'prepare' : count, 'statements' : len(KNOWLEDGE_BASE), 'seconds' : time.time() - start}
+        record.update(trace.to_dict())
+        write_trace(record)
+    else:
+        load_knowledgebase(FOL_SENTENCES)
+    # performs resolution for each query and writes 
+    # the results in query order
+    try:
+        for satisfiability in prove_queries(QUERIES):
+            write_output(satisfiability)
+    finally:
+        if SATURATION_POOL is not None:
+            SATURATION_POOL.terminate()
@@ -1,12 +1,26 @@
 import os
+import shutil
+import subprocess
+import sys
 import time
 
-for i in xrange(1,17):
-    os.system('copy /Y .\cases\input{0}.txt .\input.txt'.format(i))
+def output_words(text):
+    """
+    returns the words of an output file, the answers of a query
+    are sorted as they may be found in any order
+    """
+    return [';'.join(sorted(word.split(';'))) for word in text.split()]
+
+i = 1
+while os.path.exists(os.path.join('cases', 'input{0}.txt'.format(i))):
+    shutil.copyfile(os.path.join('cases', 'input{0}.txt'.format(i)), 'input.txt')
     print("-->On test case #{0}<--".format(i))
     start_time = time.time()
-    os.system('python Resolution.py')
+    subprocess.call([sys.executable, 'Resolution.py'])
     print("Runing time: {0}ms".format(int((time.time() - start_time) * 1000)))
-    os.system('FC .\output.txt .\cases\output{0}.txt'.format(i))
-    os.system('copy /Y .\output.txt .\cases\Your_output{0}.txt'.format(i))
-    os.system('del .\output.txt')
\ No newline at end of file
+    with open('output.txt') as f_output, open(os.path.join('cases', 'output{0}.txt'.format(i))) as f_expected:
+        if output_words(f_output.read()) != output_words(f_expected.read()):
+            print("Output differs from cases/output{0}.txt".format(i))
+    shutil.copyfile('output.txt', os.path.join('cases', 'Your_output{0}.txt'.format(i)))
+    os.remove('output.txt')
+    i += 1
@@ -0,0 +1,129 @@
+import json
+import os
+import sys
+import SocketServer
+from Resolution import Prover
+from Answers import Answers
+
+"""
+Protocol of the prover server, one JSON object per line in each direction:
+
+request : {"id": 1, "kb": "family", "query": "Mother(Ann,x)"}
+          "id" is optional and echoed back, "kb" may be left out when
+          only one Knowledge base is loaded
+answer : {"id": 1, "kb": "family", "query": "Mother(Ann,x)", "result": true}
+         with ANSWER_EXTRACTION set in Resolution.py, the answer of a query
+         with variables also has "answers": [{"x": "Bob"}, {"x": "Tom"}]
+tell : {"kb": "family", "tell": "Mother(Ann,Bob)"} adds an FOL sentence
+retract : {"kb": "family", "retract": "Mother(Ann,Bob)"} removes a told
+          sentence, the result of the answer is false if it was not told
+error : {"id": 1, "error": "unknown knowledge base: famly"}
+
+Answers are written as soon as each query is proved.
+"""
+
+USAGE = 'usage: python Server.py [--socket PATH] NAME=INPUT_FILE ...'
+
+class ProverServer(object):
+    """
+    Provers of the loaded Knowledge bases by name, answers requests
+    member variables include:
+    provers : maps the name of a Knowledge base to its Prover
+    """
+    def __init__(self, provers):
+        self.provers = provers
+
+    def answer(self, line):
+        """
+        answers one request line (a query, tell or retract),
+        returns the answer line
+        """
+        answer = {}
+        try:
+            request = json.loads(line)
+            if 'id' in request:
+                answer['id'] = request['id']
+            name = request.get('kb')
+            if name is None and len(self.provers) == 1:
+                name = self.provers.keys()[0]
+            if name not in self.provers:
+                answer['error'] = 'unknown knowledge base: ' + str(name)
+            elif 'tell' in request:
+                answer['kb'] = name
+                answer['tell'] = request['tell']
+                self.provers[name].tell(request['tell'])
+                answer['result'] = True
+            elif 'retract' in request:
+                answer['kb'] = name
+                answer['retract'] = request['retract']
+                answer['result'] = self.provers[name].retract(request['retract'])
+            else:
+                answer['kb'] = name
+                answer['query'] = request['query']
+                result = self.provers[name].prove(request['query'])
+                if isinstance(result, Answers):
+                    answer['answers'] = result.bindings()
+                    result = True
+                answer['result'] = result
+        except Exception, error:
+            answer['error'] = str(error)
+        return json.dumps(answer)
+
+    def serve_stream(self, f_input, f_output):
+        """
+        answers the request lines of f_input until it is closed
+        """
+        for line in iter(f_input.readline, ''):
+            if line.strip():
+                f_output.write(self.answer(line) + '\n')
+                f_output.flush()
+
+class RequestHandler(SocketServer.StreamRequestHandler):
+    """
+    answers the requests of one client connection
+    """
+    def handle(self):
+        self.server.prover_server.serve_stream(self.rfile, self.wfile)
+
+class ThreadingUnixServer(SocketServer.ThreadingMixIn, SocketServer.UnixStreamServer):
+    """
+    Unix socket server handling every client in its own thread
+    """
+    daemon_threads = True
+
+def serve_socket(prover_server, path):
+    """
+    answers requests of clients connecting to the Unix socket at path
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    server = ThreadingUnixServer(path, RequestHandler)
+    server.prover_server = prover_server
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+        os.remove(path)
+
+def main(arguments):
+    socket_path = None
+    provers = {}
+    while arguments:
+        argument = arguments.pop(0)
+        if argument == '--socket' and arguments:
+            socket_path = arguments.pop(0)
+        elif '=' in argument:
+            name, _, input_file = argument.partition('=')
+            provers[name] = Prover.from_file(input_file)
+        else:
+            sys.exit(USAGE)
+    if not provers:
+        sys.exit(USAGE)
+    prover_server = ProverServer(provers)
+    if socket_path is None:
+        prover_server.serve_stream(sys.stdin, sys.stdout)
+    else:
+        serve_socket(prover_server, socket_path)
+
+if __name__ == '__main__':
+    main(sys.argv[1:])
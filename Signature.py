@@ -0,0 +1,184 @@
+from Predicate import SYMBOLS
+from Unification import is_variable
+import Trace
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+"""
+Literal signatures used to select the pairs of statements that may
+resolve in one vectorized step per predicate instead of one index
+lookup per predicate. The signature of a predicate is its group,
+(name, negative, arity), which is its bit in the bitmap over predicate
+names and polarities, and the row of its constant arguments as symbol
+ids, VARIABLE for a variable. Two predicates of complementary groups
+may unify only if at every position the rows hold the same constant
+or at least one variable, which is what TermIndex.retrieve checks one
+predicate at a time.
+Signatures need NumPy, available() is False without it and the
+resolution loops then keep using the TermIndex.
+"""
+
+VARIABLE = -1
+CHUNK_ELEMENTS = 1 << 20        #largest number of argument comparisons made in one vectorized step
+
+def available():
+    return numpy is not None
+
+def make_index(enabled):
+    """
+    returns a new empty SignatureIndex, or None when enabled is
+    False or NumPy is missing, so no rows are kept for nothing
+    """
+    if enabled and available():
+        return SignatureIndex()
+    return None
+
+class SignatureIndex(object):
+    """
+    signature rows of the predicates of a set of statements, the index
+    of the prepared Knowledge base is kept with its other indexes and
+    every query resolves against an overlay of it, which holds the rows
+    of the statements added by the query only
+    member variables include:
+    groups : maps (predicate name, negative, arity) to a SignatureGroup
+    statements : indexed statements, the owner ids of rows index this list
+    owners : maps an indexed statement to its owner id
+    removed : owner ids of removed statements, their rows are skipped
+    parent : index the self index is layered over, or None
+    """
+    def __init__(self, statements=(), parent=None):
+        self.groups = {}
+        self.statements = []
+        self.owners = {}
+        self.removed = set()
+        self.parent = parent
+        for statement in statements:
+            self.add(statement)
+
+    def overlay(self):
+        """
+        returns a new empty index layered over the self index,
+        the self index must not change while the overlay is used
+        """
+        return SignatureIndex(parent=self)
+
+    def add(self, statement):
+        """
+        adds a row for every predicate of statement
+        """
+        owner = len(self.statements)
+        self.statements.append(statement)
+        self.owners[statement] = owner
+        for predicate in statement.predicate_set:
+            key = (predicate.name, predicate.negative, len(predicate.arguments))
+            if key in self.groups:
+                group = self.groups[key]
+            else:
+                group = SignatureGroup(key[2])
+                self.groups[key] = group
+            group.add(signature_row(predicate), owner)
+
+    def remove(self, statement):
+        """
+        removes statement, its rows are skipped until more than half
+        of the statements are removed and the rows are built again
+        """
+        if statement not in self.owners:
+            return
+        self.removed.add(self.owners.pop(statement))
+        if 2 * len(self.removed) > len(self.statements):
+            statements = [statement for owner, statement in enumerate(self.statements) if owner not in self.removed]
+            self.__init__(statements, self.parent)
+
+    def resolving_pairs(self, batch):
+        """
+        returns a dict mapping every indexed statement that may resolve
+        with a statement of batch to the set of those batch statements
+        (both statements of a pair appear when both are in batch)
+        """
+        batch_index = SignatureIndex(batch)
+        pairs = {}
+        index = self
+        while index is not None:
+            index.collect_pairs(batch_index, batch, pairs)
+            index = index.parent
+        if Trace.TRACE is not None:
+            Trace.TRACE.observe('signature_pairs', sum(len(statements) for statements in pairs.itervalues()))
+        return pairs
+
+    def collect_pairs(self, batch_index, batch, pairs):
+        """
+        adds to pairs the pairs of the rows of the self index (and
+        not of its parent) with the rows of batch_index
+        """
+        for key, batch_group in batch_index.groups.iteritems():
+            complement = (key[0], not key[1], key[2])
+            if complement not in self.groups:
+                continue
+            group = self.groups[complement]
+            for owners, batch_owners in group.compatible(batch_group):
+                for owner, batch_owner in zip(owners.tolist(), batch_owners.tolist()):
+                    if owner in self.removed:
+                        continue
+                    statement = self.statements[owner]
+                    if statement in pairs:
+                        pairs[statement].add(batch[batch_owner])
+                    else:
+                        pairs[statement] = set([batch[batch_owner]])
+
+class SignatureGroup(object):
+    """
+    signature rows of the predicates of one (predicate name, negative, arity)
+    group, rows are appended to a list and moved into the arrays when
+    the group is next compared
+    member variables include:
+    rows : int32 array of constant ids, one row per predicate
+    owners : int32 array of the owner id of each row
+    pending_rows, pending_owners : rows and owners not yet in the arrays
+    """
+    def __init__(self, arity):
+        self.rows = numpy.empty((0, arity), dtype=numpy.int32)
+        self.owners = numpy.empty(0, dtype=numpy.int32)
+        self.pending_rows = []
+        self.pending_owners = []
+
+    def add(self, row, owner):
+        self.pending_rows.append(row)
+        self.pending_owners.append(owner)
+
+    def flush(self):
+        if not self.pending_owners:
+            return
+        rows = numpy.array(self.pending_rows, dtype=numpy.int32).reshape(len(self.pending_owners), self.rows.shape[1])
+        self.rows = numpy.concatenate((self.rows, rows))
+        self.owners = numpy.concatenate((self.owners, numpy.array(self.pending_owners, dtype=numpy.int32)))
+        self.pending_rows = []
+        self.pending_owners = []
+
+    def compatible(self, group):
+        """
+        yields pairs of owner arrays, of the self group and of group,
+        of the rows that agree on every position holding two constants,
+        the rows of the self group are compared in chunks of at most
+        CHUNK_ELEMENTS argument comparisons
+        """
+        self.flush()
+        group.flush()
+        other_rows = group.rows[numpy.newaxis, :, :]
+        other_variables = other_rows == VARIABLE
+        step = max(1, CHUNK_ELEMENTS // max(1, other_rows.shape[1] * other_rows.shape[2]))
+        for start in xrange(0, len(self.owners), step):
+            rows = self.rows[start:start+step, numpy.newaxis, :]
+            agree = (rows == other_rows) | (rows == VARIABLE) | other_variables
+            own, other = numpy.nonzero(agree.all(axis=2))
+            if len(own):
+                yield self.owners[start:start+step][own], group.owners[other]
+
+def signature_row(predicate):
+    """
+    returns the constant ids of the arguments of predicate, VARIABLE for variables
+    """
+    return [VARIABLE if is_variable(arg) else SYMBOLS.intern(arg) for arg in predicate.arguments]
@@ -0,0 +1,175 @@
+import heapq
+
+class Strategy(object):
+    """
+    search strategy of the given clause engine, decides whether
+    the statements of the knowledge base start in the active set and
+    in which order passive statements are picked as given clauses
+    strategies are composed with CompositeStrategy (see make_strategy)
+    member variables include:
+    set_of_support : if True the knowledge base statements start in
+    the active set, so they are never picked as given clauses
+    age_ratio : if set, every age_ratio-th given clause is the oldest
+    passive statement instead of the one with the best priority
+    """
+    set_of_support = False
+    age_ratio = None
+
+    def priority(self, statement):
+        """
+        returns a tuple, passive statements with smaller
+        priorities are picked first, ties are picked oldest first
+        """
+        return ()
+
+class SetOfSupport(Strategy):
+    """
+    set of support, only the negated query and the statements
+    infered from it are given clauses, the knowledge base
+    statements are never resolved with each other
+    """
+    set_of_support = True
+
+class UnitPreference(Strategy):
+    """
+    picks the statements with the fewest predicates first
+    """
+    def priority(self, statement):
+        return (len(statement.predicate_set),)
+
+class ClauseWeight(Strategy):
+    """
+    picks the lightest statements first, the weight of a statement
+    is its number of predicate and argument symbols, every age_ratio-th
+    pick takes the oldest statement so heavy statements are not starved
+    """
+    def __init__(self, age_ratio=None):
+        self.age_ratio = age_ratio
+
+    def priority(self, statement):
+        return (statement_weight(statement),)
+
+class CompositeStrategy(Strategy):
+    """
+    combination of strategies, the knowledge base starts in the
+    active set if any strategy is a set of support and priorities are
+    compared strategy by strategy in the order the strategies are given
+    """
+    def __init__(self, strategies):
+        self.strategies = strategies
+        for strategy in strategies:
+            if strategy.set_of_support:
+                self.set_of_support = True
+            if strategy.age_ratio:
+                self.age_ratio = strategy.age_ratio
+
+    def priority(self, statement):
+        priority = ()
+        for strategy in self.strategies:
+            priority += strategy.priority(statement)
+        return priority
+
+def statement_weight(statement):
+    """
+    returns the number of predicate and argument symbols of statement
+    """
+    weight = 0
+    for predicate in statement.predicate_set:
+        weight += 1 + len(predicate.arguments)
+    return weight
+
+STRATEGIES = {
+    'fifo' : Strategy,
+    'sos' : SetOfSupport,
+    'unit' : UnitPreference,
+    'weight' : ClauseWeight
+}
+
+def make_strategy(description):
+    """
+    builds a strategy from a description such as 'sos+unit+weight:5',
+    names are joined by '+' and 'weight' takes an optional age ratio
+    'fifo' alone picks passive statements in the order they were infered
+    """
+    strategies = []
+    for name in description.split('+'):
+        name, _, argument = name.strip().partition(':')
+        if name not in STRATEGIES:
+            raise ValueError('unknown search strategy: ' + name)
+        if argument:
+            strategies.append(STRATEGIES[name](int(argument)))
+        else:
+            strategies.append(STRATEGIES[name]())
+    if len(strategies) == 1:
+        return strategies[0]
+    return CompositeStrategy(strategies)
+
+class PassiveQueue(object):
+    """
+    passive set of the given clause engine, a priority queue
+    ordered by the priority of a strategy and then by age
+    removed statements are skipped lazily when popped
+    member variables include:
+    strategy : Strategy giving the priorities
+    heap : (priority, age, statement) entries
+    age_heap : (age, statement) entries, used when strategy has an age_ratio
+    members : maps the statements currently in the queue to their age
+    """
+    def __init__(self, strategy):
+        self.strategy = strategy
+        self.heap = []
+        self.age_heap = []
+        self.members = {}
+        self.age = 0
+        self.picks = 0
+
+    def __len__(self):
+        return len(self.members)
+
+    def __contains__(self, statement):
+        return statement in self.members
+
+    def push(self, statement):
+        self.age += 1
+        self.members[statement] = self.age
+        heapq.heappush(self.heap, (self.strategy.priority(statement), self.age, statement))
+        if self.strategy.age_ratio:
+            heapq.heappush(self.age_heap, (self.age, statement))
+
+    def discard(self, statement):
+        self.members.pop(statement, None)
+
+    def evict(self, count, policy):
+        """
+        removes and returns count statements, the heaviest ones (by
+        statement_weight) if policy is 'heaviest', otherwise the oldest,
+        the heaps are compacted so evicted statements are released
+        """
+        if policy == 'heaviest':
+            victims = heapq.nlargest(count, self.members, key=statement_weight)
+        else:
+            victims = [statement for statement, age in heapq.nsmallest(count, self.members.iteritems(), key=lambda member: member[1])]
+        for statement in victims:
+            del self.members[statement]
+        members = self.members
+        self.heap = [entry for entry in self.heap if members.get(entry[-1]) == entry[1]]
+        heapq.heapify(self.heap)
+        self.age_heap = [entry for entry in self.age_heap if members.get(entry[-1]) == entry[0]]
+        heapq.heapify(self.age_heap)
+        return victims
+
+    def pop(self):
+        """
+        removes and returns the next given clause, or None if empty
+        """
+        self.picks += 1
+        heaps = [self.heap, self.age_heap]
+        if self.strategy.age_ratio and self.picks % self.strategy.age_ratio == 0:
+            heaps.reverse()
+        for heap in heaps:
+            while heap:
+                statement = heapq.heappop(heap)[-1]
+                if statement in self.members:
+                    del self.members[statement]
+                    return statement
+        return None
@@ -0,0 +1,110 @@
+import time
+
+"""
+Counters and timers of the prover, collected into the Trace of the
+query being proved. Tracing is disabled while TRACE is None, the
+instrumented code then only pays for the TRACE is None check, so
+counters are kept out of the innermost loops where possible.
+TRACE is global to the process, traces of queries proved in other
+threads or in worker processes are not collected.
+"""
+
+TRACE = None            #Trace being collected, None while tracing is disabled
+
+class Trace(object):
+    """
+    counters and timers of one traced run (a query or the
+    preparation of the Knowledge base)
+    member variables include:
+    counters : maps a name to a number of events
+    timers : maps a name to seconds spent
+    observations : maps a name to [number, total, maximum] of observed values
+    series : maps a name to the list of values appended in order
+    """
+    def __init__(self):
+        self.counters = {}
+        self.timers = {}
+        self.observations = {}
+        self.series = {}
+
+    def count(self, name, amount=1):
+        self.counters[name] = self.counters.get(name, 0) + amount
+
+    def add_time(self, name, seconds):
+        self.timers[name] = self.timers.get(name, 0.0) + seconds
+
+    def observe(self, name, value):
+        if name in self.observations:
+            observation = self.observations[name]
+            observation[0] += 1
+            observation[1] += value
+            if value > observation[2]:
+                observation[2] = value
+        else:
+            self.observations[name] = [1, value, value]
+
+    def append(self, name, value):
+        if name in self.series:
+            self.series[name].append(value)
+        else:
+            self.series[name] = [value]
+
+    def to_dict(self):
+        """
+        returns the trace as a dict of JSON serializable values
+        """
+        observations = {}
+        for name, (number, total, maximum) in self.observations.iteritems():
+            observations[name] = {'count' : number, 'mean' : float(total) / number, 'max' : maximum}
+        return {'counters' : self.counters, 'timers' : self.timers, 'observations' : observations, 'series' : self.series}
+
+class Phase(object):
+    """
+    context manager adding the time spent in its block to a timer of trace
+    """
+    def __init__(self, trace, name):
+        self.trace = trace
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.time()
+
+    def __exit__(self, *exc_info):
+        self.trace.add_time(self.name, time.time() - self.start)
+
+class NoPhase(object):
+    """
+    context manager doing nothing, used while tracing is disabled
+    """
+    def __enter__(self):
+        pass
+
+    def __exit__(self, *exc_info):
+        pass
+
+NO_PHASE = NoPhase()
+
+def start():
+    """
+    starts collecting a new trace and returns it
+    """
+    global TRACE
+    TRACE = Trace()
+    return TRACE
+
+def stop():
+    """
+    stops collecting and returns the collected trace
+    """
+    global TRACE
+    trace = TRACE
+    TRACE = None
+    return trace
+
+def phase(name):
+    """
+    returns a context manager timing its block as name
+    """
+    if TRACE is None:
+        return NO_PHASE
+    return Phase(TRACE, name)
@@ -0,0 +1,137 @@
+import Trace
+
+class Variable(str):
+    """
+    an argument that is a variable, variables are typed so that
+    they are told apart from constants by their type instead of
+    inspecting the argument string
+    """
+    __slots__ = ()
+
+def is_variable(argument):
+    """
+    returns True if argument is a variable
+    """
+    return type(argument) is Variable
+
+class Bindings(object):
+    """
+    triangular substitution, a variable may be bound to another
+    bound variable and is resolved by walking the chain of bindings,
+    every binding is recorded on a trail so the bindings made after
+    a mark can be undone without copying the substitution
+    member variables include:
+    bound : maps a bound variable to its term
+    trail : bound variables in binding order
+    """
+    __slots__ = ('bound', 'trail')
+
+    def __init__(self):
+        self.bound = {}
+        self.trail = []
+
+    def walk(self, term):
+        """
+        returns the term a variable is finally bound to, or
+        the term itself if it is a constant or an unbound variable
+        """
+        bound = self.bound
+        while type(term) is Variable and term in bound:
+            term = bound[term]
+        return term
+
+    def mark(self):
+        return len(self.trail)
+
+    def undo(self, mark):
+        """
+        removes the bindings made after mark
+        """
+        bound = self.bound
+        trail = self.trail
+        while len(trail) > mark:
+            del bound[trail.pop()]
+
+    def unify_arguments(self, arguments1, arguments2):
+        """
+        unifies two argument tuples of equal length position by
+        position, extending the bindings, returns False and undoes
+        the bindings made by this call if they cannot be unified
+        arguments are variables or constants, so walking both arguments
+        to their terms before binding is a complete occurs check
+        """
+        bound = self.bound
+        trail = self.trail
+        mark = len(trail)
+        for index in xrange(len(arguments1)):
+            term1 = arguments1[index]
+            while type(term1) is Variable and term1 in bound:
+                term1 = bound[term1]
+            term2 = arguments2[index]
+            while type(term2) is Variable and term2 in bound:
+                term2 = bound[term2]
+            if term1 == term2:
+                continue
+            if type(term1) is Variable:
+                bound[term1] = term2
+                trail.append(term1)
+            elif type(term2) is Variable:
+                bound[term2] = term1
+                trail.append(term2)
+            else:
+                self.undo(mark)
+                return False
+        return True
+
+    def unify_predicates(self, predicate1, predicate2):
+        """
+        unifies the arguments of two predicates after a fast
+        check of predicate symbol and arity, see unify_arguments
+        """
+        if predicate1.symbol != predicate2.symbol or len(predicate1.arguments) != len(predicate2.arguments):
+            return False
+        return self.unify_arguments(predicate1.arguments, predicate2.arguments)
+
+    def substitution(self):
+        """
+        returns the bindings as an idempotent substitution dict
+        mapping every bound variable to its final term
+        """
+        return dict((variable, self.walk(variable)) for variable in self.bound)
+
+def unify(predicate1, predicate2):
+    """
+    unifies two predicates and returns the substitution
+    returns False if predicates cannot be unified
+    """
+    bindings = Bindings()
+    if bindings.unify_predicates(predicate1, predicate2):
+        return bindings.substitution()
+    return False
+
+def unify_many(predicate, candidates, complementary=False):
+    """
+    unifies predicate with each candidate predicate, yields
+    (candidate, substitution) for every candidate that unifies
+    candidates with a different symbol or arity (or the same sign when
+    complementary is True) are rejected before any unification, one
+    Bindings object is reused across candidates by undoing its bindings
+    """
+    trace = Trace.TRACE
+    bindings = Bindings()
+    symbol = predicate.symbol
+    negative = predicate.negative
+    arguments = predicate.arguments
+    arity = len(arguments)
+    for candidate in candidates:
+        if candidate.symbol != symbol or len(candidate.arguments) != arity:
+            continue
+        if complementary and candidate.negative == negative:
+            continue
+        if bindings.unify_arguments(arguments, candidate.arguments):
+            if trace is not None:
+                trace.count('unify_successes')
+            yield candidate, bindings.substitution()
+            bindings.undo(0)
+        elif trace is not None:
+            trace.count('unify_failures')